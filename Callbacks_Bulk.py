@@ -16,8 +16,9 @@ def fig_probabilitydistributions(slider_Ef, slider_T):
     Ef, T = slider_Ef*Physics_Semiconductors.e, slider_T # J,K
 
     E = np.arange(500)/100*Physics_Semiconductors.e # J
-    fc,fv = Physics_Semiconductors.Func_fcfv(E, Ef, T) # dimensionless
-    fb = Physics_Semiconductors.Func_MaxwellBoltzmann(E, Ef, T) # dimensionless
+    fc,fv,fb = np.empty((3,)+E.shape) # work arrays, allocated in one block
+    fc,fv = Physics_Semiconductors.Func_fcfv(E, Ef, T, out=(fc,fv)) # dimensionless
+    fb = Physics_Semiconductors.Func_MaxwellBoltzmann(E, Ef, T, out=fb) # dimensionless
     min_x, max_x, min_y, max_y = 0, 1, 0, 1.5
 
     fig = go.Figure()
@@ -60,10 +61,11 @@ def fig_carrierintegrals(slider_Ef, slider_T,slider_gc,slider_gv):
     mn = slider_gc*Physics_Semiconductors.me # kg
     mp = slider_gv*Physics_Semiconductors.me # kg
 
-    # Calculated vaues
-    fc,fv = Physics_Semiconductors.Func_fcfv(E, Ef, T) # dimensionless
-    gc, gv = Physics_Semiconductors.Func_gcgv(E, Ec, Ev, mn, mp) # /(J*m**3)
-    Ne, Nh = Physics_Semiconductors.Func_NeNh(E, fc, fv, gc, gv, Ec, Ev) # /(J*m**3)
+    # Calculated vaues, into work arrays allocated in one block
+    fc,fv,gc,gv,Ne,Nh = np.empty((6,)+E.shape)
+    fc,fv = Physics_Semiconductors.Func_fcfv(E, Ef, T, out=(fc,fv)) # dimensionless
+    gc, gv = Physics_Semiconductors.Func_gcgv(E, Ec, Ev, mn, mp, out=(gc,gv)) # /(J*m**3)
+    Ne, Nh = Physics_Semiconductors.Func_NeNh(E, fc, fv, gc, gv, Ec, Ev, out=(Ne,Nh)) # /(J*m**3)
 
     scaling = 1e28 # Just to display on the same axes
     min_x, max_x, min_y, max_y = 0, 1, 0, 1 #eV,dimensionless
@@ -130,9 +132,10 @@ def fig_carriers(slider_donor, slider_acceptor, slider_T, slider_emass, slider_h
     NC,NV = Physics_Semiconductors.Func_NCNV(T, mn, mp)
     Ei = Physics_Semiconductors.Func_Ei(Ev, Ec, T, mn, mp)
     Ef = Physics_Semiconductors.Func_Ef(NC, NV, Ec, Ev, T, Nd, Na)
-    gc, gv = Physics_Semiconductors.Func_gcgv(E, Ec, Ev, mn, mp)
-    fc, fv = Physics_Semiconductors.Func_fcfv(E, Ef, T)
-    Ne, Nh = Physics_Semiconductors.Func_NeNh(E, fc, fv, gc, gv, Ec, Ev)
+    fc,fv,gc,gv,Ne,Nh = np.empty((6,)+E.shape) # work arrays, allocated in one block
+    gc, gv = Physics_Semiconductors.Func_gcgv(E, Ec, Ev, mn, mp, out=(gc,gv))
+    fc, fv = Physics_Semiconductors.Func_fcfv(E, Ef, T, out=(fc,fv))
+    Ne, Nh = Physics_Semiconductors.Func_NeNh(E, fc, fv, gc, gv, Ec, Ev, out=(Ne,Nh))
 
     min_x, max_x, min_y, max_y = 0, 1, 0, 3
 
@@ -129,6 +129,7 @@ AFM_Card2 = html.Div([
                 {'label': '   ', 'value': 5.5},
                 {'label': '   zins=6 , A var', 'value': 6},
                 {'label': '   ', 'value': 6.5},
+                {'label': '   Vg x zins map', 'value': 7},
                 ]
             ,value=[], labelStyle={"width": '50%','display': 'inline-block'}),
         ], className='presets_container'),
@@ -50,7 +50,7 @@ regime_biasarray = np.array([])
 Qs_biasarray = np.array([])
 Vs_biasarray = np.array([])
 for Vg_variable in Vg_array:
-    NC,NV,Ec,Ev,Ei,Ef,no,po,ni,nb,pb,CPD,LD,Vs,Es,Qs,F,regime_soln, zsem_soln,Vsem_soln,Esem_soln,Qsem_soln, P_soln = Organization_IntermValues.Surface_calculations(Vg_variable,zins,Eg,epsilon_sem,WFmet,EAsem,Nd,Na,mn,mp,T)
+    NC,NV,Ec,Ev,Ei,Ef,no,po,ni,nb,pb,CPD,LD,eta,Vs,Es,Qs,F,regime_soln, zsem_soln,Vsem_soln,Esem_soln,Qsem_soln, P_soln = Organization_IntermValues.Surface_calculations(Vg_variable,zins,Eg,epsilon_sem,WFmet,EAsem,Nd,Na,mn,mp,T)
     p_soln = zsem_soln*Qsem_soln #electric dipole  #Cm 
     P_soln = np.sum(p_soln) #electric polarization #Cm
     Qtot_soln = np.sum(Qsem_soln)
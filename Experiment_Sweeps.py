@@ -2,7 +2,7 @@
 import Presets
 import Physics_Semiconductors
 import Organization_IntermValues
-import Organization_BuildArrays
+import Organization_Sweep
 import numpy as np
 import pandas as pd
 import os
@@ -33,7 +33,9 @@ slider_timesteps, slider_amplitude, slider_resfreq, slider_lag, slider_springcon
 
 slider_biassteps = 256
 slider_zinssteps = 512
-slider_timesteps = 200
+slider_timesteps = 200 # None: the fewest that resolve df and dg to df_tol and dg_tol (Sweep_timesteps)
+df_tol = 1e-3 #Hz
+dg_tol = 1e-3 #meV
 
 slider_zins_OG = slider_zins#+slider_amplitude
 slider_Vg_OG = 0
@@ -45,6 +47,7 @@ slider_lag = 0
 
 slider_zins_array = np.array([])
 slider_Vg_array = np.array([-8,-7,-6,-4,-3,-2,-1,0,1,2,3,4,5,6,7,8,9,10])
+map_outputs = [] # (Vg x zins) maps, e.g. ['Vs','F','df','dg']
 
 experiment = 'single'
 #experiment = 'Nd'
@@ -93,150 +96,86 @@ elif experiment=='alpha':
 elif experiment=='Q':
     ExperimentArray =  np.linspace(10000,30000,101)
 
+# Slider input varied by each experiment
+sweep = {'Nd': 'donor', 'Na': 'acceptor', 'Q': 'Qfactor'}.get(experiment, experiment)
+
+params = {'Vg': slider_Vg_OG, 'zins': slider_zins_OG, 'alpha': slider_alpha, 'Eg': slider_Eg, 'epsilonsem': slider_epsilonsem, 'WFmet': slider_WFmet, 'EAsem': slider_EAsem,
+          'donor': slider_donor, 'acceptor': slider_acceptor, 'emass': slider_emass, 'hmass': slider_hmass, 'T': slider_T,
+          'timesteps': slider_timesteps, 'amplitude': slider_amplitude, 'resfreq': slider_resfreq, 'lag': slider_lag, 'springconst': slider_springconst,
+          'tipradius': slider_tipradius, 'cantheight': slider_cantheight, 'cantarea': slider_cantarea, 'Qfactor': slider_Qfactor, 'geometrybuttons': geometrybuttons}
+outputs = ['Vs','F','P','Vscant','Fcant','Pcant','Es','Qs','df','dg']
+
+# With slider_timesteps = None, the fewest timesteps that resolve df and dg over the bias range, at the closest
+# approach swept (the zinsarrays start at 0.01 nm), for the base settings (an experiment varying amplitude or
+# lag may want a tighter tolerance)
+if slider_timesteps is None:
+    slider_zins_min = np.min(np.append(slider_zins_array, 0.01 if len(slider_Vg_array) else slider_zins_OG))
+    slider_timesteps, df_error, dg_error, converged = Organization_Sweep.Sweep_timesteps(params, np.linspace(-10,10,slider_biassteps), slider_zins_min, df_tol, dg_tol)
+    params['timesteps'] = slider_timesteps
+    print('timesteps = %d (df error %.1e Hz, dg error %.1e meV%s)' % (slider_timesteps, df_error, dg_error, '' if converged else ', tolerance not reached'))
+
+amplitude,frequency,lag,timesteps,tipradius,cantheight,cantarea,time_AFMarray,zins_AFMarray,zinslag_AFMarray=Organization_IntermValues.AFM1_inputvalues(slider_amplitude,slider_resfreq,slider_lag,slider_timesteps,slider_tipradius,slider_cantheight,slider_cantarea, slider_zins_OG*1e-9)
+
+# One sweep over the outer axis (one save folder each), the experimental parameter and the inner axis at once
+    # Returns every output, unit converted, as an array [outer, experiment, inner].
+    # The experiment may replace the outer axis, but not the inner one, whose sweep would overwrite it.
+def Sweep_experiment(outer, outer_array, inner, inner_array):
+    if experiment != 'single' and sweep == inner:
+        raise ValueError("experiment '%s' varies %s, the inner axis of the %sarrays; empty slider_%s_array to skip them" % (experiment, inner, inner, outer))
+    axes = {outer: outer_array}
+    if experiment != 'single':
+        axes[sweep] = ExperimentArray # replaces the outer axis if that is the one varied
+    axes[inner] = inner_array
+    result = Organization_Sweep.Sweep(params, axes, outputs)
+
+    # Unit conversions
+    result['Vs'] = result['Vs']/Physics_Semiconductors.e
+    result['F'] = result['F']*np.pi*tipradius**2*1e12
+    result['P'] = result['P']*1e9
+    result['Vscant'] = result['Vscant']/Physics_Semiconductors.e
+    result['Fcant'] = result['Fcant']*cantarea*1e12
+    result['Pcant'] = result['Pcant']*1e9
+    result['Es'] = result['Es']*1e-9
+    result['Qs'] = result['Qs']/Physics_Semiconductors.e*(1e-9)**2
+
+    result['Ftot'] = 0*result['F']
+    if 1 in geometrybuttons:
+        result['Ftot']+=result['F']
+    if 2 in geometrybuttons:
+        result['Ftot']+=result['Fcant']
+
+    for name in outputs+['Ftot']:
+        if experiment == 'single':
+            result[name] = result[name][:,None]
+        elif sweep == outer:
+            result[name] = np.broadcast_to(result[name], (len(outer_array),)+result[name].shape)
+    return result
+
+# Save one outer point: a column of inner values, then one column per experimental value
+def Sweep_save(result, index, name, label, inner_labels, thispath):
+    if not os.path.exists(thispath):
+        os.mkdir(thispath)
+    for output in outputs[:6]+['Ftot']+outputs[6:]:
+        save = pd.DataFrame({label: [str(x) for x in inner_labels]})
+        for column, values in zip(ExperimentArray, result[output][index]):
+            save = pd.concat([save, pd.DataFrame({str(column): [str(x) for x in values]})], axis=1, join="outer")
+        save.to_csv(os.path.join(thispath,'_'.join([name+'array_'+output+'.csv'])), index=False)
+
 ################################################################################
 # biasarrays
 
 slider_Vg = slider_Vg_OG
 slider_zins = slider_zins_OG
 
-for slider_zins in slider_zins_array:
-
+if len(slider_zins_array):
     print('\n'+'biasarrays')
-    print('zins = ' + str(slider_zins))
-
-    ##################
-    # Initialize arrays
-
-    Vg_array = np.linspace(-10,10,slider_biassteps)*Physics_Semiconductors.e #J
-
-    save_Vs_biasarrays = pd.DataFrame({"Vg_array": [str(x) for x in Vg_array/Physics_Semiconductors.e]})
-    save_F_biasarrays = pd.DataFrame({"Vg_array": [str(x) for x in Vg_array/Physics_Semiconductors.e]})
-    save_P_biasarrays = pd.DataFrame({"Vg_array": [str(x) for x in Vg_array/Physics_Semiconductors.e]})
-    save_Vscant_biasarrays = pd.DataFrame({"Vg_array": [str(x) for x in Vg_array/Physics_Semiconductors.e]})
-    save_Fcant_biasarrays = pd.DataFrame({"Vg_array": [str(x) for x in Vg_array/Physics_Semiconductors.e]})
-    save_Pcant_biasarrays = pd.DataFrame({"Vg_array": [str(x) for x in Vg_array/Physics_Semiconductors.e]})
-    save_Ftot_biasarrays = pd.DataFrame({"Vg_array": [str(x) for x in Vg_array/Physics_Semiconductors.e]})
-    save_Es_biasarrays = pd.DataFrame({"Vg_array": [str(x) for x in Vg_array/Physics_Semiconductors.e]})
-    save_Qs_biasarrays = pd.DataFrame({"Vg_array": [str(x) for x in Vg_array/Physics_Semiconductors.e]})
-    save_df_biasarrays = pd.DataFrame({"Vg_array": [str(x) for x in Vg_array/Physics_Semiconductors.e]})
-    save_dg_biasarrays = pd.DataFrame({"Vg_array": [str(x) for x in Vg_array/Physics_Semiconductors.e]})
-
-    ##################
-    # Vary experimental parameter
-
-    for index in range(len(ExperimentArray)):
-
-        if experiment=='single':
-            pass 
-        elif experiment=='Nd':
-            slider_donor = ExperimentArray[index]
-        elif experiment=='Na':
-            slider_acceptor = ExperimentArray[index]
-        elif experiment=='emass':
-            slider_emass = ExperimentArray[index]
-        elif experiment=='hmass':
-            slider_hmass = ExperimentArray[index]
-        elif experiment=='Eg':
-            slider_Eg = ExperimentArray[index]
-        elif experiment=='epsilonsem':
-            slider_epsilonsem = ExperimentArray[index]
-        elif experiment=='amplitude':
-            slider_amplitude = ExperimentArray[index]
-        elif experiment=='zins':
-            slider_zins = ExperimentArray[index]
-        elif experiment=='lag':
-            slider_lag = ExperimentArray[index]
-        elif experiment=='WFmet':
-            slider_WFmet = ExperimentArray[index]
-        elif experiment=='EAsem':
-            slider_EAsem = ExperimentArray[index]
-        elif experiment=='T':
-            slider_T = ExperimentArray[index]
-        elif experiment=='alpha':
-            slider_alpha = ExperimentArray[index]
-        elif experiment=='Q':
-            slider_Qfactor = ExperimentArray[index]
-        else:
-            print('Error: Experiment not defined.')
-
-
-        # Input values and arrays
-        Vg,zins,Eg,epsilon_sem,WFmet,EAsem,Nd,Na,mn,mp,T,sampletype,biassteps,zinssteps,Vg_array,zins_array=Organization_IntermValues.Surface_inputvalues(slider_Vg,slider_zins,slider_alpha,slider_Eg,slider_epsilonsem,slider_WFmet,slider_EAsem,slider_donor,slider_acceptor,slider_emass,slider_hmass,slider_T,slider_biassteps,slider_zinssteps)
-        amplitude,frequency,lag,timesteps,tipradius,cantheight,cantarea,time_AFMarray,zins_AFMarray,zinslag_AFMarray=Organization_IntermValues.AFM1_inputvalues(slider_amplitude,slider_resfreq,slider_lag,slider_timesteps,slider_tipradius,slider_cantheight,slider_cantarea, zins)
-        springconst,Qfactor=Organization_IntermValues.AFM2_inputvalues(slider_springconst,slider_Qfactor)
-
-        # Calculations and results
-        NC,NV,Ec,Ev,Ei,Ef,no,po,ni,nb,pb,CPD,LD,Vs,Es,Qs,F,regime, zsem,Vsem,Esem,Qsem, P = Organization_IntermValues.Surface_calculations(Vg,zins,Eg,epsilon_sem,WFmet,EAsem,Nd,Na,mn,mp,T)
-        Vs_biasarray,F_biasarray,P_biasarray,Vscant_biasarray,Fcant_biasarray,Pcant_biasarray,Es_biasarray,Qs_biasarray,df_biasarray,dg_biasarray = Organization_BuildArrays.All_biasarrays(Vg_array,zins,Na,Nd,epsilon_sem,T,CPD,LD,nb,pb,ni,frequency,springconst,amplitude,Qfactor,tipradius,time_AFMarray,zins_AFMarray,zinslag_AFMarray,cantheight,cantarea,timesteps,geometrybuttons)
-
-        # Account for alpha
-        Vg = slider_Vg*Physics_Semiconductors.e #J
-        Vg_array = np.linspace(-10,10,biassteps)*Physics_Semiconductors.e #J
-
-        # Unit conversions
-        Vs_biasarray = Vs_biasarray/Physics_Semiconductors.e
-        F_biasarray = F_biasarray*np.pi*tipradius**2*1e12
-        P_biasarray = P_biasarray*1e9
-        Vscant_biasarray = Vscant_biasarray/Physics_Semiconductors.e
-        Fcant_biasarray = Fcant_biasarray*cantarea*1e12
-        Pcant_biasarray = Pcant_biasarray*1e9
-        Es_biasarray = Es_biasarray*1e-9
-        Qs_biasarray = Qs_biasarray/Physics_Semiconductors.e*(1e-9)**2
-        df_biasarray = df_biasarray
-        dg_biasarray = dg_biasarray
-
-        Ftot_biasarray = 0*Vg_array
-        if 1 in geometrybuttons:
-            Ftot_biasarray+=F_biasarray
-        if 2 in geometrybuttons:
-            Ftot_biasarray+=Fcant_biasarray
-
-        # Organize arrays for saving
-        save_Vs_biasarray = pd.DataFrame({str(ExperimentArray[index]): [str(x) for x in Vs_biasarray]})
-        save_F_biasarray = pd.DataFrame({str(ExperimentArray[index]): [str(x) for x in F_biasarray]})
-        save_P_biasarray = pd.DataFrame({str(ExperimentArray[index]): [str(x) for x in P_biasarray]})
-        save_Vscant_biasarray = pd.DataFrame({str(ExperimentArray[index]): [str(x) for x in Vscant_biasarray]})
-        save_Fcant_biasarray = pd.DataFrame({str(ExperimentArray[index]): [str(x) for x in Fcant_biasarray]})
-        save_Pcant_biasarray = pd.DataFrame({str(ExperimentArray[index]): [str(x) for x in Pcant_biasarray]})
-        save_Ftot_biasarray = pd.DataFrame({str(ExperimentArray[index]): [str(x) for x in Ftot_biasarray]})
-        save_Es_biasarray = pd.DataFrame({str(ExperimentArray[index]): [str(x) for x in Es_biasarray]})
-        save_Qs_biasarray = pd.DataFrame({str(ExperimentArray[index]): [str(x) for x in Qs_biasarray]})
-        save_df_biasarray = pd.DataFrame({str(ExperimentArray[index]): [str(x) for x in df_biasarray]})
-        save_dg_biasarray = pd.DataFrame({str(ExperimentArray[index]): [str(x) for x in dg_biasarray]})
-
-        save_Vs_biasarrays = pd.concat([save_Vs_biasarrays,save_Vs_biasarray], axis=1, join="outer")
-        save_F_biasarrays = pd.concat([save_F_biasarrays,save_F_biasarray], axis=1, join="outer")
-        save_P_biasarrays = pd.concat([save_P_biasarrays,save_P_biasarray], axis=1, join="outer")
-        save_Vscant_biasarrays = pd.concat([save_Vscant_biasarrays,save_Vscant_biasarray], axis=1, join="outer")
-        save_Fcant_biasarrays = pd.concat([save_Fcant_biasarrays,save_Fcant_biasarray], axis=1, join="outer")
-        save_Pcant_biasarrays = pd.concat([save_Pcant_biasarrays,save_Pcant_biasarray], axis=1, join="outer")
-        save_Ftot_biasarrays = pd.concat([save_Ftot_biasarrays,save_Ftot_biasarray], axis=1, join="outer")
-        save_Es_biasarrays = pd.concat([save_Es_biasarrays,save_Es_biasarray], axis=1, join="outer")
-        save_Qs_biasarrays = pd.concat([save_Qs_biasarrays,save_Qs_biasarray], axis=1, join="outer")
-        save_df_biasarrays = pd.concat([save_df_biasarrays,save_df_biasarray], axis=1, join="outer")
-        save_dg_biasarrays = pd.concat([save_dg_biasarrays,save_dg_biasarray], axis=1, join="outer")
-
-        print(index+1,'/', len(ExperimentArray))
-
-    ##################
-    # Save
-
-    thispath = "Xsave_Sweeps_%s_%.1f_%.2f_%.2f_%.2f_%.2f_%.2f_%.2f_%.3f_%.3f_%.1f_%.1f_%.1f_%.0f_%.2f_%.0f_%.0f_%.2f_%.2f_%.3f_%.0f/" % (experiment,slider_Vg, slider_zins, slider_alpha, slider_Eg, slider_epsilonsem, slider_WFmet, slider_EAsem, slider_donor, slider_acceptor, slider_emass, slider_hmass, slider_T, slider_amplitude, slider_resfreq, slider_lag, slider_springconst, slider_Qfactor, slider_tipradius, slider_cantheight, slider_cantarea)
-
-    if not os.path.exists(thispath):
-        os.mkdir(thispath)
+    slider_Vg_biasarray = np.linspace(-10,10,slider_biassteps)
+    result = Sweep_experiment('zins', slider_zins_array, 'Vg', slider_Vg_biasarray)
 
-    save_Vs_biasarrays.to_csv(os.path.join(thispath,'_'.join(['biasarray_Vs.csv'])), index=False)
-    save_F_biasarrays.to_csv(os.path.join(thispath,'_'.join(['biasarray_F.csv'])), index=False)
-    save_P_biasarrays.to_csv(os.path.join(thispath,'_'.join(['biasarray_P.csv'])), index=False)
-    save_Vscant_biasarrays.to_csv(os.path.join(thispath,'_'.join(['biasarray_Vscant.csv'])), index=False)
-    save_Fcant_biasarrays.to_csv(os.path.join(thispath,'_'.join(['biasarray_Fcant.csv'])), index=False)
-    save_Pcant_biasarrays.to_csv(os.path.join(thispath,'_'.join(['biasarray_Pcant.csv'])), index=False)
-    save_Ftot_biasarrays.to_csv(os.path.join(thispath,'_'.join(['biasarray_Ftot.csv'])), index=False)
-    save_Es_biasarrays.to_csv(os.path.join(thispath,'_'.join(['biasarray_Es.csv'])), index=False)
-    save_Qs_biasarrays.to_csv(os.path.join(thispath,'_'.join(['biasarray_Qs.csv'])), index=False)
-    save_df_biasarrays.to_csv(os.path.join(thispath,'_'.join(['biasarray_df.csv'])), index=False)
-    save_dg_biasarrays.to_csv(os.path.join(thispath,'_'.join(['biasarray_dg.csv'])), index=False)
+    for index, slider_zins in enumerate(slider_zins_array):
+        print('zins = ' + str(slider_zins))
+        thispath = "Xsave_Sweeps_%s_%.1f_%.2f_%.2f_%.2f_%.2f_%.2f_%.2f_%.3f_%.3f_%.1f_%.1f_%.1f_%.0f_%.2f_%.0f_%.0f_%.2f_%.2f_%.3f_%.0f/" % (experiment,slider_Vg, slider_zins, slider_alpha, slider_Eg, slider_epsilonsem, slider_WFmet, slider_EAsem, slider_donor, slider_acceptor, slider_emass, slider_hmass, slider_T, slider_amplitude, slider_resfreq, slider_lag, slider_springconst, slider_Qfactor, slider_tipradius, slider_cantheight, slider_cantarea)
+        Sweep_save(result, index, 'bias', "Vg_array", slider_Vg_biasarray, thispath)
 
 
 
@@ -246,129 +185,39 @@ for slider_zins in slider_zins_array:
 slider_Vg = slider_Vg_OG
 slider_zins = slider_zins_OG
 
-for slider_Vg in slider_Vg_array:
-
+if len(slider_Vg_array):
     print('\n'+'zinsarrays')
-    print('Vg = ' + str(slider_Vg))
-
-    ##################
-    # Initialize arrays
-
-    zins_array = np.linspace(0.01,50,slider_zinssteps)*1e-9 #m
-
-    save_Vs_zinsarrays = pd.DataFrame({"zins_array": [str(x) for x in zins_array*1e9]})
-    save_F_zinsarrays = pd.DataFrame({"zins_array": [str(x) for x in zins_array*1e9]})
-    save_P_zinsarrays = pd.DataFrame({"zins_array": [str(x) for x in zins_array*1e9]})
-    save_Vscant_zinsarrays = pd.DataFrame({"zins_array": [str(x) for x in zins_array*1e9]})
-    save_Fcant_zinsarrays = pd.DataFrame({"zins_array": [str(x) for x in zins_array*1e9]})
-    save_Pcant_zinsarrays = pd.DataFrame({"zins_array": [str(x) for x in zins_array*1e9]})
-    save_Ftot_zinsarrays = pd.DataFrame({"zins_array": [str(x) for x in zins_array*1e9]})
-    save_Es_zinsarrays = pd.DataFrame({"zins_array": [str(x) for x in zins_array*1e9]})
-    save_Qs_zinsarrays = pd.DataFrame({"zins_array": [str(x) for x in zins_array*1e9]})
-    save_df_zinsarrays = pd.DataFrame({"zins_array": [str(x) for x in zins_array*1e9]})
-    save_dg_zinsarrays = pd.DataFrame({"zins_array": [str(x) for x in zins_array*1e9]})
-
-    ##################
-    # Vary experimental parameter
-
-    for index in range(len(ExperimentArray)):
-
-        if experiment=='single':
-            pass
-        elif experiment=='Nd':
-            slider_donor = ExperimentArray[index]
-        elif experiment=='Na':
-            slider_acceptor = ExperimentArray[index]
-        elif experiment=='emass':
-            mn = ExperimentArray[index]*Physics_Semiconductors.me #kg
-        elif experiment=='hmass':
-            mp = ExperimentArray[index]*Physics_Semiconductors.me #kg
-        elif experiment=='Eg':
-            Eg = ExperimentArray[index]*Physics_Semiconductors.e #J
-        elif experiment=='epsilonsem':
-            epsilon_sem = ExperimentArray[index] #dimensionless
-        elif experiment=='amplitude':
-            slider_amplitude = ExperimentArray[index]  #nm
-        elif experiment=='lag':
-            slider_lag = ExperimentArray[index] #ns
-        else:
-            print('Error: Experiment not defined.')
-
-
-        # Input values and arrays
-        Vg,zins,Eg,epsilon_sem,WFmet,EAsem,Nd,Na,mn,mp,T,sampletype,biassteps,zinssteps,Vg_array,zins_array=Organization_IntermValues.Surface_inputvalues(slider_Vg,slider_zins,slider_alpha,slider_Eg,slider_epsilonsem,slider_WFmet,slider_EAsem,slider_donor,slider_acceptor,slider_emass,slider_hmass,slider_T,slider_biassteps,slider_zinssteps)
-        amplitude,frequency,lag,timesteps,tipradius,cantheight,cantarea,time_AFMarray,zins_AFMarray,zinslag_AFMarray=Organization_IntermValues.AFM1_inputvalues(slider_amplitude,slider_resfreq,slider_lag,slider_timesteps,slider_tipradius,slider_cantheight,slider_cantarea, zins)
-        springconst,Qfactor=Organization_IntermValues.AFM2_inputvalues(slider_springconst,slider_Qfactor)
-
-        # Calculations and results
-        NC,NV,Ec,Ev,Ei,Ef,no,po,ni,nb,pb,CPD,LD,Vs,Es,Qs,F,regime, zsem,Vsem,Esem,Qsem, P = Organization_IntermValues.Surface_calculations(Vg,zins,Eg,epsilon_sem,WFmet,EAsem,Nd,Na,mn,mp,T)
-        Vs_zinsarray,F_zinsarray,P_zinsarray,Vscant_zinsarray,Fcant_zinsarray,Pcant_zinsarray,Es_zinsarray,Qs_zinsarray,df_zinsarray,dg_zinsarray  = Organization_BuildArrays.All_zinsarrays(Vg,zins,zins_array,Na,Nd,epsilon_sem,T,CPD,LD,nb,pb,ni,frequency,springconst,amplitude,Qfactor,tipradius,time_AFMarray,zins_AFMarray,zinslag_AFMarray,cantheight,cantarea,timesteps,geometrybuttons)
-
-        # Account for alpha
-        Vg = slider_Vg*Physics_Semiconductors.e #J
-        Vg_array = np.linspace(-10,10,biassteps)*Physics_Semiconductors.e #J
-
-        # Unit conversions
-        Vs_zinsarray = Vs_zinsarray/Physics_Semiconductors.e
-        F_zinsarray = F_zinsarray*np.pi*tipradius**2*1e12
-        P_zinsarray = P_zinsarray*1e9
-        Vscant_zinsarray = Vscant_zinsarray/Physics_Semiconductors.e
-        Fcant_zinsarray = Fcant_zinsarray*cantarea*1e12
-        Pcant_zinsarray = Pcant_zinsarray*1e9
-        Es_zinsarray = Es_zinsarray*1e-9
-        Qs_zinsarray = Qs_zinsarray/Physics_Semiconductors.e*(1e-9)**2
-        df_zinsarray = df_zinsarray
-        dg_zinsarray = dg_zinsarray
-
-        Ftot_zinsarray = 0*zins_array
-        if 1 in geometrybuttons:
-            Ftot_zinsarray+=F_zinsarray
-        if 2 in geometrybuttons:
-            Ftot_zinsarray+=Fcant_zinsarray
-
-        # Organize arrays for saving
-        save_Vs_zinsarray = pd.DataFrame({str(ExperimentArray[index]): [str(x) for x in Vs_zinsarray]})
-        save_F_zinsarray = pd.DataFrame({str(ExperimentArray[index]): [str(x) for x in F_zinsarray]})
-        save_P_zinsarray = pd.DataFrame({str(ExperimentArray[index]): [str(x) for x in P_zinsarray]})
-        save_Vscant_zinsarray = pd.DataFrame({str(ExperimentArray[index]): [str(x) for x in Vscant_zinsarray]})
-        save_Fcant_zinsarray = pd.DataFrame({str(ExperimentArray[index]): [str(x) for x in Fcant_zinsarray]})
-        save_Pcant_zinsarray = pd.DataFrame({str(ExperimentArray[index]): [str(x) for x in Pcant_zinsarray]})
-        save_Ftot_zinsarray = pd.DataFrame({str(ExperimentArray[index]): [str(x) for x in Ftot_zinsarray]})
-        save_Es_zinsarray = pd.DataFrame({str(ExperimentArray[index]): [str(x) for x in Es_zinsarray]})
-        save_Qs_zinsarray = pd.DataFrame({str(ExperimentArray[index]): [str(x) for x in Qs_zinsarray]})
-        save_df_zinsarray = pd.DataFrame({str(ExperimentArray[index]): [str(x) for x in df_zinsarray]})
-        save_dg_zinsarray = pd.DataFrame({str(ExperimentArray[index]): [str(x) for x in dg_zinsarray]})
-
-        save_Vs_zinsarrays = pd.concat([save_Vs_zinsarrays,save_Vs_zinsarray], axis=1, join="outer")
-        save_F_zinsarrays = pd.concat([save_F_zinsarrays,save_F_zinsarray], axis=1, join="outer")
-        save_P_zinsarrays = pd.concat([save_P_zinsarrays,save_P_zinsarray], axis=1, join="outer")
-        save_Vscant_zinsarrays = pd.concat([save_Vscant_zinsarrays,save_Vscant_zinsarray], axis=1, join="outer")
-        save_Fcant_zinsarrays = pd.concat([save_Fcant_zinsarrays,save_Fcant_zinsarray], axis=1, join="outer")
-        save_Pcant_zinsarrays = pd.concat([save_Pcant_zinsarrays,save_Pcant_zinsarray], axis=1, join="outer")
-        save_Ftot_zinsarrays = pd.concat([save_Ftot_zinsarrays,save_Ftot_zinsarray], axis=1, join="outer")
-        save_Es_zinsarrays = pd.concat([save_Es_zinsarrays,save_Es_zinsarray], axis=1, join="outer")
-        save_Qs_zinsarrays = pd.concat([save_Qs_zinsarrays,save_Qs_zinsarray], axis=1, join="outer")
-        save_df_zinsarrays = pd.concat([save_df_zinsarrays,save_df_zinsarray], axis=1, join="outer")
-        save_dg_zinsarrays = pd.concat([save_dg_zinsarrays,save_dg_zinsarray], axis=1, join="outer")
-
-        print(index+1,'/', len(ExperimentArray))
-
-    ##################
-    # Save
-
-    thispath = "Xsave_Sweeps_%s_%.1f_%.2f_%.2f_%.2f_%.2f_%.2f_%.2f_%.3f_%.3f_%.1f_%.1f_%.1f_%.0f_%.2f_%.0f_%.0f_%.2f_%.2f_%.3f_%.0f/" % (experiment,slider_Vg, slider_zins, slider_alpha, slider_Eg, slider_epsilonsem, slider_WFmet, slider_EAsem, slider_donor, slider_acceptor, slider_emass, slider_hmass, slider_T, slider_amplitude, slider_resfreq, slider_lag, slider_springconst, slider_Qfactor, slider_tipradius, slider_cantheight, slider_cantarea)
+    slider_zins_zinsarray = np.linspace(0.01,50,slider_zinssteps)
+    result = Sweep_experiment('Vg', slider_Vg_array, 'zins', slider_zins_zinsarray)
+
+    for index, slider_Vg in enumerate(slider_Vg_array):
+        print('Vg = ' + str(slider_Vg))
+        thispath = "Xsave_Sweeps_%s_%.1f_%.2f_%.2f_%.2f_%.2f_%.2f_%.2f_%.3f_%.3f_%.1f_%.1f_%.1f_%.0f_%.2f_%.0f_%.0f_%.2f_%.2f_%.3f_%.0f/" % (experiment,slider_Vg, slider_zins, slider_alpha, slider_Eg, slider_epsilonsem, slider_WFmet, slider_EAsem, slider_donor, slider_acceptor, slider_emass, slider_hmass, slider_T, slider_amplitude, slider_resfreq, slider_lag, slider_springconst, slider_Qfactor, slider_tipradius, slider_cantheight, slider_cantarea)
+        Sweep_save(result, index, 'zins', "zins_array", slider_zins_zinsarray, thispath)
+
 
+
+################################################################################
+# maparrays
+
+slider_Vg = slider_Vg_OG
+slider_zins = slider_zins_OG
+
+if len(map_outputs):
+    print('\n'+'maparrays')
+    slider_Vg_maparray = np.linspace(-10,10,slider_biassteps)
+    slider_zins_maparray = np.linspace(0.01,50,slider_zinssteps)
+    result = Organization_Sweep.Sweep_map(params, slider_Vg_maparray, slider_zins_maparray, map_outputs)
+
+    # Unit conversions
+    conversions = {'Vs': 1/Physics_Semiconductors.e, 'F': np.pi*tipradius**2*1e12, 'P': 1e9, 'Vscant': 1/Physics_Semiconductors.e, 'Fcant': cantarea*1e12, 'Pcant': 1e9, 'Es': 1e-9, 'Qs': 1/Physics_Semiconductors.e*(1e-9)**2}
+
+    # Save one table per output: a column of Vg values, then one column per zins
+    thispath = "Xsave_Maps_%.2f_%.2f_%.2f_%.2f_%.2f_%.3f_%.3f_%.1f_%.1f_%.1f_%.0f_%.2f_%.0f_%.0f_%.2f_%.2f_%.3f_%.0f/" % (slider_alpha, slider_Eg, slider_epsilonsem, slider_WFmet, slider_EAsem, slider_donor, slider_acceptor, slider_emass, slider_hmass, slider_T, slider_amplitude, slider_resfreq, slider_lag, slider_springconst, slider_Qfactor, slider_tipradius, slider_cantheight, slider_cantarea)
     if not os.path.exists(thispath):
         os.mkdir(thispath)
-
-    save_Vs_zinsarrays.to_csv(os.path.join(thispath,'_'.join(['zinsarray_Vs.csv'])), index=False)
-    save_F_zinsarrays.to_csv(os.path.join(thispath,'_'.join(['zinsarray_F.csv'])), index=False)
-    save_P_zinsarrays.to_csv(os.path.join(thispath,'_'.join(['zinsarray_P.csv'])), index=False)
-    save_Vscant_zinsarrays.to_csv(os.path.join(thispath,'_'.join(['zinsarray_Vscant.csv'])), index=False)
-    save_Fcant_zinsarrays.to_csv(os.path.join(thispath,'_'.join(['zinsarray_Fcant.csv'])), index=False)
-    save_Pcant_zinsarrays.to_csv(os.path.join(thispath,'_'.join(['zinsarray_Pcant.csv'])), index=False)
-    save_Ftot_zinsarrays.to_csv(os.path.join(thispath,'_'.join(['zinsarray_Ftot.csv'])), index=False)
-    save_Es_zinsarrays.to_csv(os.path.join(thispath,'_'.join(['zinsarray_Es.csv'])), index=False)
-    save_Qs_zinsarrays.to_csv(os.path.join(thispath,'_'.join(['zinsarray_Qs.csv'])), index=False)
-    save_df_zinsarrays.to_csv(os.path.join(thispath,'_'.join(['zinsarray_df.csv'])), index=False)
-    save_dg_zinsarrays.to_csv(os.path.join(thispath,'_'.join(['zinsarray_dg.csv'])), index=False)
+    for output in map_outputs:
+        save = pd.DataFrame({"Vg_array": [str(x) for x in slider_Vg_maparray]})
+        for column, values in zip(slider_zins_maparray, (result[output]*conversions.get(output, 1)).T):
+            save = pd.concat([save, pd.DataFrame({str(column): [str(x) for x in values]})], axis=1, join="outer")
+        save.to_csv(os.path.join(thispath,'_'.join(['maparray_'+output+'.csv'])), index=False)
@@ -1,9 +1,9 @@
 # All this script does is build arrays. There is zero physics in here.
 
-from joblib import Parallel, delayed
-
+import Organization_Executor
 import Physics_Semiconductors
 import Physics_BandDiagram
+import Physics_Poisson
 import Physics_ncAFM
 import Physics_Optics
 
@@ -18,274 +18,325 @@ epsilon_o = Physics_Semiconductors.epsilon_o
 
 ################################################################################
 ################################################################################
+# Lazy evaluation of builder outputs
+
+# Evaluate only the requested quantities, and only what they depend on
+    # rules maps each quantity (or a tuple of quantities computed together) to (function, dependencies);
+    # the function is called with the dependencies as keyword arguments. values holds the inputs.
+    # Every quantity is computed at most once. Returns all values known at the end, inputs included.
+def Builder_evaluate(rules, values, outputs):
+    values = dict(values)
+    def evaluate(name):
+        if name not in values:
+            names = [key for key in rules if key == name or (isinstance(key, tuple) and name in key)]
+            if not names:
+                raise ValueError('Unknown output: %s' % name)
+            function, dependencies = rules[names[0]]
+            result = function(**{dependency: evaluate(dependency) for dependency in dependencies})
+            values.update(zip(names[0], result) if isinstance(names[0], tuple) else [(name, result)])
+        return values[name]
+    for name in outputs:
+        evaluate(name)
+    return values
+
+# Distinct (Vg, zins) pairs of a sweep
+    # A cosine trajectory passes every height twice per cycle, once on the way down and once on the way up,
+    # so an oscillation has only about half as many distinct points as timesteps. Values that agree to
+    # 1e-12 relative are taken as one, well within the tolerance of the Vs solve. Below a few hundred
+    # points the bookkeeping costs more than the solves it saves, so every point is kept as it is.
+    # Returns the index of one point per distinct pair, and the pair of every point (shaped like them).
+def Builder_unique(Vg, zins):
+    Vg, zins = np.broadcast_arrays(np.asarray(Vg,dtype=float), np.asarray(zins,dtype=float))
+    if Vg.size < 256:
+        return np.arange(Vg.size), np.arange(Vg.size).reshape(Vg.shape)
+    keys = []
+    for x in (zins, Vg):
+        mantissa, exponent = np.frexp(x.ravel())
+        keys += [np.round(mantissa*1e12), exponent]
+    order = np.lexsort(keys)
+    first = np.ones(len(order), dtype=bool)
+    first[1:] = np.any([np.diff(key[order]) != 0 for key in keys], axis=0)
+    inverse = np.empty(len(order), dtype=int)
+    inverse[order] = np.cumsum(first)-1
+    return order[first], inverse.reshape(Vg.shape)
+
+# Quantities at the semiconductor surface, from Vg and zins (which broadcast against each other)
+    # Vs, solved once per distinct (Vg, zins) (Builder_unique) and scattered back to every point,
+    # then f, Es, Qs, F, P from it, and on demand the band bending below the surface,
+    # zsem, Vsem, Esem, Qsem, one row per point (Physics_BandDiagram.BandBending_batch).
+    # eta is the bulk state's (Organization_IntermValues.Surface_bulkcalculations), so the carriers follow
+    # Fermi-Dirac statistics as in Surface_calculations; every builder below takes it after ni (None for
+    # Boltzmann statistics).
+    # solver names one of Physics_Semiconductors.Vs_solvers, or is a solver itself with their signature.
+    # A solver with its own BandBending (Physics_Poisson.Poisson_solver, for a doping profile) gives
+    # the band bending too, from Vg and zins, in the layout of BandBending_batch, and Es then follows
+    # from Vs across the insulator, since f holds for uniform doping only.
+def Surface_rules(Na,Nd,epsilon_sem,T,CPD,nb,pb,ni,eta, solver='batch', guess=None):
+    solve = Physics_Semiconductors.Vs_solvers[solver] if isinstance(solver, str) else solver
+    def Vs(Vg, zins):
+        Vg, zins = np.broadcast_arrays(np.asarray(Vg,dtype=float), np.asarray(zins,dtype=float))
+        index, inverse = Builder_unique(Vg, zins)
+        guesses = None if guess is None else np.broadcast_to(guess, Vg.shape).ravel()[index]
+        return solve(Vg.ravel()[index],zins.ravel()[index],CPD,Na,Nd,epsilon_sem,T,nb,pb,ni, guess=guesses, eta=eta)[inverse]
+    rules = {
+        'Vs': (Vs, ('Vg','zins')),
+        'f': (lambda Vs: Physics_Semiconductors.Func_f(T,Vs,nb,pb, eta), ('Vs',)),
+        'Es': (lambda Vs, f: Physics_Semiconductors.Func_E(nb,pb,Vs,epsilon_sem,T,f), ('Vs','f')),
+        'Qs': (lambda Es: Physics_Semiconductors.Func_Q(epsilon_sem,Es), ('Es',)),
+        'F': (lambda Qs, Vg, zins: Physics_Semiconductors.Func_F(Qs,CPD,Vg,zins), ('Qs','Vg','zins')),
+        'P': (lambda Es: Physics_Semiconductors.Func_P(epsilon_sem,Es), ('Es',)),
+        ('zsem','Vsem','Esem','Qsem'): (lambda Vs: Physics_BandDiagram.BandBending_batch(T,epsilon_sem,nb,pb,Vs, eta), ('Vs',)),
+    }
+    if hasattr(solve, 'BandBending'):
+        rules['Es'] = (lambda Vs, Vg, zins: Physics_Semiconductors.Func_Cins(zins)*(Vg-CPD-Vs)/(e*epsilon_sem*epsilon_o), ('Vs','Vg','zins'))
+        rules[('zsem','Vsem','Esem','Qsem')] = (lambda Vg, zins: solve.BandBending(Vg,zins,CPD,epsilon_sem,T,nb,pb, eta), ('Vg','zins'))
+    return rules
+
+# With outputs (e.g. {'Vs','F'}), the builders below compute only those and return them as a dict;
+# otherwise they return their usual list.
+def Builder_outputs(values, outputs, default):
+    if outputs is None:
+        return [values[name] for name in default]
+    return {name: values[name] for name in outputs}
 
-def Surface_biasarrays(Vg_array,zins,Na,Nd,epsilon_sem,T,CPD,LD,nb,pb,ni):
-
-    # Calculate list any functions that are not constant as a function of Vg
-    def compute(Vg_variable):
-        Vs_soln = Physics_Semiconductors.Func_Vs(Vg_variable,zins,CPD,Na,Nd,epsilon_sem,T,nb,pb,ni)
-        f_soln = Physics_Semiconductors.Func_f(T,Vs_soln,nb,pb)
-        Es_soln = Physics_Semiconductors.Func_E(nb,pb,Vs_soln,epsilon_sem,T,f_soln)
-        Qs_soln = Physics_Semiconductors.Func_Q(epsilon_sem,Es_soln)
-        F_soln = Physics_Semiconductors.Func_F(Qs_soln,CPD,Vg_variable,zins)
-        zsem_soln, Vsem_soln, Esem_soln, Qsem_soln = Physics_BandDiagram.BandBending(T,epsilon_sem,nb,pb,Vs_soln)
-        P_soln = Physics_Semiconductors.Func_P(epsilon_sem,Es_soln)
-        return [Vs_soln,F_soln,Es_soln,Qs_soln, P_soln]
-
-    # Then parallelize the calculations for every Vg
-    result = Parallel(n_jobs=-1)(
-        delayed(compute)(Vg) for Vg in Vg_array
-    )
-    return [
-        np.asarray([Vs_soln for Vs_soln,F_soln,Es_soln,Qs_soln,P_soln in result]),
-        np.asarray([F_soln  for Vs_soln,F_soln,Es_soln,Qs_soln,P_soln in result]),
-        np.asarray([Es_soln for Vs_soln,F_soln,Es_soln,Qs_soln,P_soln in result]),
-        np.asarray([Qs_soln for Vs_soln,F_soln,Es_soln,Qs_soln,P_soln in result]),
-        np.asarray([P_soln for Vs_soln,F_soln,Es_soln,Qs_soln,P_soln in result]),
-    ]
-
+################################################################################
 ################################################################################
 
-def Surface_zinsarrays(zins_array,Vg,Na,Nd,epsilon_sem,T,CPD,LD,nb,pb,ni):
-
-    # Calculate list any functions that are not constant as a function of zins
-    def compute(zins_variable):
-        Vs_soln = Physics_Semiconductors.Func_Vs(Vg,zins_variable,CPD,Na,Nd,epsilon_sem,T,nb,pb,ni)
-        f_soln = Physics_Semiconductors.Func_f(T,Vs_soln,nb,pb)
-        Es_soln = Physics_Semiconductors.Func_E(nb,pb,Vs_soln,epsilon_sem,T,f_soln)
-        Qs_soln = Physics_Semiconductors.Func_Q(epsilon_sem,Es_soln)
-        F_soln = Physics_Semiconductors.Func_F(Qs_soln,CPD,Vg,zins_variable)
-        zsem_soln, Vsem_soln, Esem_soln, Qsem_soln = Physics_BandDiagram.BandBending(T,epsilon_sem,nb,pb,Vs_soln)
-        P_soln = Physics_Semiconductors.Func_P(epsilon_sem,Es_soln)
-        return [Vs_soln,F_soln,Es_soln,Qs_soln,P_soln]
-
-    # Then parallelize the calculations for every zins
-    result = Parallel(n_jobs=-1)(
-        delayed(compute)(zins) for zins in zins_array
-    )
-    return [
-        np.asarray([Vs_soln for Vs_soln,F_soln,Es_soln,Qs_soln,P_soln in result]),
-        np.asarray([F_soln  for Vs_soln,F_soln,Es_soln,Qs_soln,P_soln in result]),
-        np.asarray([Es_soln for Vs_soln,F_soln,Es_soln,Qs_soln,P_soln in result]),
-        np.asarray([Qs_soln for Vs_soln,F_soln,Es_soln,Qs_soln,P_soln in result]),
-        np.asarray([P_soln for Vs_soln,F_soln,Es_soln,Qs_soln,P_soln in result]),
-    ]
+def Surface_biasarrays(Vg_array,zins,Na,Nd,epsilon_sem,T,CPD,LD,nb,pb,ni,eta, solver='batch', outputs=None):
 
+    # Solve Vs for every Vg at once, then the requested quantities that follow from it
+    default = ['Vs','F','Es','Qs','P']
+    values = Builder_evaluate(Surface_rules(Na,Nd,epsilon_sem,T,CPD,nb,pb,ni,eta, solver), {'Vg': Vg_array, 'zins': zins}, outputs or default)
+    return Builder_outputs(values, outputs, default)
 
-################################################################################
 ################################################################################
 
-def AFM_timearrays(time_AFMarray,zins_AFMarray,zinslag_AFMarray,Vg,zins,Na,Nd,epsilon_sem,T,CPD,LD,nb,pb,ni):
+def Surface_zinsarrays(zins_array,Vg,Na,Nd,epsilon_sem,T,CPD,LD,nb,pb,ni,eta, solver='batch', outputs=None, heights=None):
 
-    # Calculate list any functions that are not constant as a function of time
-    def compute(time_variable):
+    # Solve Vs for every zins at once, then the requested quantities that follow from it
+    # With heights, as in AFM_timearrays, one row per element above the tip (e.g. [0, cantheight]).
+    default = ['Vs','F','Es','Qs','P']
+    if heights is not None:
+        zins_array = np.asarray(zins_array)+np.reshape(heights, (-1,1))
+    values = Builder_evaluate(Surface_rules(Na,Nd,epsilon_sem,T,CPD,nb,pb,ni,eta, solver), {'Vg': Vg, 'zins': zins_array}, outputs or default)
+    return Builder_outputs(values, outputs, default)
 
-        zins_soln = zins_AFMarray[np.where(time_AFMarray == time_variable)][0]
-        zinslag_soln = zinslag_AFMarray[np.where(time_AFMarray == time_variable)][0]
 
-        Vs_soln = Physics_Semiconductors.Func_Vs(Vg,zinslag_soln,CPD,Na,Nd,epsilon_sem,T,nb,pb,ni)
-        f_soln = Physics_Semiconductors.Func_f(T,Vs_soln,nb,pb)
-        Es_soln = Physics_Semiconductors.Func_E(nb,pb,Vs_soln,epsilon_sem,T,f_soln)
-        Qs_soln = Physics_Semiconductors.Func_Q(epsilon_sem,Es_soln)
-        F_soln = Physics_Semiconductors.Func_F(Qs_soln,CPD,Vg,zinslag_soln)
-        P_soln = Physics_Semiconductors.Func_P(epsilon_sem,Es_soln)
-        return [Vs_soln,Es_soln,Qs_soln,F_soln,P_soln]
+################################################################################
+################################################################################
 
-    # Then parallelize the calculations for every time
-    result = Parallel(n_jobs=-1)(
-        delayed(compute)(time) for time in time_AFMarray
-    )
-    return [
-        np.asarray([Vs_soln for Vs_soln,Es_soln,Qs_soln,F_soln,P_soln in result]),
-        np.asarray([Es_soln  for Vs_soln,Es_soln,Qs_soln,F_soln,P_soln in result]),
-        np.asarray([Qs_soln  for Vs_soln,Es_soln,Qs_soln,F_soln,P_soln in result]),
-        np.asarray([F_soln  for Vs_soln,Es_soln,Qs_soln,F_soln,P_soln in result]),
-        np.asarray([P_soln  for Vs_soln,Es_soln,Qs_soln,F_soln,P_soln in result]),
-    ]
+def AFM_timearrays(time_AFMarray,zins_AFMarray,zinslag_AFMarray,Vg,zins,Na,Nd,epsilon_sem,T,CPD,LD,nb,pb,ni,eta, solver='batch', guess=None, outputs=None, heights=None):
+
+    # Solve Vs for every time at once (the surface responds to the lagged position)
+    # With heights (e.g. [0, cantheight] for the tip and the cantilever), the oscillation of every element
+    # that far above the tip is solved in the same pass, and each output gets one row per element.
+    default = ['Vs','Es','Qs','F','P']
+    if heights is not None:
+        zinslag_AFMarray = np.asarray(zinslag_AFMarray)+np.reshape(heights, (-1,)+(1,)*np.ndim(zinslag_AFMarray))
+    values = Builder_evaluate(Surface_rules(Na,Nd,epsilon_sem,T,CPD,nb,pb,ni,eta, solver, guess), {'Vg': Vg, 'zins': zinslag_AFMarray}, outputs or default)
+    return Builder_outputs(values, outputs, default)
+
+# Quantities of one point of an AFM sweep
+    # The oscillation of the tip (AFM_timearrays), stacked with that of the cantilever when any of outputs
+    # needs it, their values at the bottom of the oscillation (timesteps/2), the swing DP in P, and df, dg.
+def AFM_rules(time_AFMarray,zins_AFMarray,zinslag_AFMarray,Vg,zins,Na,Nd,epsilon_sem,T,CPD,LD,nb,pb,ni,eta,frequency,springconst,amplitude,Qfactor,tipradius,cantheight,cantarea,timesteps,geometrybuttons, solver='batch', guesses=None, outputs=()):
+    Vs_guess, Vscant_guess = guesses or (None, None)
+    names = ['Vs','Es','Qs','F','P']
+    def bottom(name):
+        return lambda **oscillation: oscillation[name][int(timesteps/2)]
+    def dfdg(F_AFMarray=0, Fcant_AFMarray=0):
+        return Physics_ncAFM.dfdg(time_AFMarray,F_AFMarray,Fcant_AFMarray,frequency,springconst,amplitude,Qfactor,tipradius,cantarea,geometrybuttons)
+    rules = {
+        'DP': (lambda P_AFMarray: max(P_AFMarray)-min(P_AFMarray), ('P_AFMarray',)),
+        ('df','dg'): (dfdg, tuple(name for button, name in [(1,'F_AFMarray'), (2,'Fcant_AFMarray')] if button in geometrybuttons)),
+    }
+    if any(name.endswith('cant') for name in outputs) or (2 in geometrybuttons and any(name in outputs for name in ('df','dg','harmonics'))):
+        guess = None if Vs_guess is None or Vscant_guess is None else np.stack((Vs_guess, Vscant_guess))
+        def oscillations():
+            values = AFM_timearrays(time_AFMarray,zins_AFMarray,zinslag_AFMarray,Vg,zins,Na,Nd,epsilon_sem,T,CPD,LD,nb,pb,ni,eta, solver, guess, heights=[0,cantheight])
+            return [x[0] for x in values]+[x[1] for x in values]
+        rules[tuple(name+'_AFMarray' for name in names)+tuple(name+'cant_AFMarray' for name in names)] = (oscillations, ())
+    else:
+        rules[tuple(name+'_AFMarray' for name in names)] = (lambda: AFM_timearrays(time_AFMarray,zins_AFMarray,zinslag_AFMarray,Vg,zins,Na,Nd,epsilon_sem,T,CPD,LD,nb,pb,ni,eta, solver, Vs_guess), ())
+    for name in names:
+        rules[name] = (bottom(name+'_AFMarray'), (name+'_AFMarray',))
+        rules[name+'cant'] = (bottom(name+'cant_AFMarray'), (name+'cant_AFMarray',))
+    return rules
+
+# Fewest timesteps that resolve df and dg to a tolerance
+    # The integrands of dfdg are smooth and periodic over the oscillation, so the trapezoid rule on the
+    # uniform grid of AFM1_inputvalues is already a Fourier quadrature: its error falls off exponentially
+    # with timesteps (faster than any fixed-order rule, Gauss-Legendre included, on a periodic integrand).
+    # Starting from timesteps, the grid is doubled, solving F only at the new midpoints, until df and dg
+    # (at every Vg, which may be an array of bias points) change by at most df_tol (Hz) and dg_tol (meV).
+    # The fine grid is far more accurate than the coarse one, so that change estimates the error of the
+    # coarse grid, which is returned: [timesteps, df_error, dg_error, converged]. The search stops at
+    # maxtimesteps regardless, and then converged is False.
+def AFM_quadrature(Vg,zins,Na,Nd,epsilon_sem,T,CPD,LD,nb,pb,ni,eta,frequency,springconst,amplitude,Qfactor,tipradius,lag,cantheight,cantarea,geometrybuttons, df_tol=1e-3, dg_tol=1e-3, timesteps=8, maxtimesteps=2**16, solver='batch'):
+    Vg = np.reshape(Vg, (-1,1))
+    heights = [0, cantheight] if 2 in geometrybuttons else [0]
+    def forces(phase):
+        zinslag_AFMarray = zins+amplitude+amplitude*np.cos(phase+lag)[None,:] #m, as in AFM1_inputvalues, one row per Vg
+        return AFM_timearrays(None,None,zinslag_AFMarray,Vg,zins,Na,Nd,epsilon_sem,T,CPD,LD,nb,pb,ni,eta, solver, outputs=['F'], heights=heights)['F']
+    def project(F_AFMarray, timesteps):
+        time_AFMarray = np.linspace(0, 2, timesteps+1)*np.pi/frequency #s/rad
+        return np.array(Physics_ncAFM.dfdg(time_AFMarray,F_AFMarray[0],F_AFMarray[-1],frequency,springconst,amplitude,Qfactor,tipradius,cantarea,geometrybuttons))
+
+    F_AFMarray = forces(np.linspace(0, 2, timesteps+1)*np.pi)
+    coarse = project(F_AFMarray, timesteps)
+    while True:
+        fine_AFMarray = np.empty(F_AFMarray.shape[:-1]+(2*timesteps+1,))
+        fine_AFMarray[...,::2] = F_AFMarray
+        fine_AFMarray[...,1::2] = forces((2*np.arange(timesteps)+1)*np.pi/timesteps)
+        fine = project(fine_AFMarray, 2*timesteps)
+        df_error, dg_error = np.max(np.abs(fine-coarse), axis=1)
+        converged = df_error <= df_tol and dg_error <= dg_tol
+        if converged or 2*timesteps >= maxtimesteps:
+            return [timesteps, df_error, dg_error, converged]
+        timesteps, F_AFMarray, coarse = 2*timesteps, fine_AFMarray, fine
 
 ################################################################################
 
 def AFM_banddiagrams(zins_AFMarray,Vg,T,Nd,Na,WFmet,EAsem,epsilon_sem, ni,nb,pb,Vs,Ec,Ev,Ei,Ef,Eg,CPD):
 
-    # Calculate list any functions that are not constant as a function of zins
-    def compute(zins_variable):
-        Vs_soln = Physics_Semiconductors.Func_Vs(Vg,zins_variable,CPD,Na,Nd,epsilon_sem,T,nb,pb,ni)
-        zsem_soln, Vsem_soln, Esem_soln, Qsem_soln = Physics_BandDiagram.BandBending(T,epsilon_sem,nb,pb,Vs_soln)
-        zgap_soln,Vgap_soln,zvac_soln,Vvac_soln,zmet_soln,Vmet_soln,zarray_soln,Earray_soln,Qarray_soln  = Physics_BandDiagram.BandDiagram(Vg,zins_variable,T,Nd,Na,WFmet,EAsem,epsilon_sem, ni,nb,pb,Vs_soln,Ec,Ev,Ef,Ei,Eg,CPD, zsem_soln,Vsem_soln,Esem_soln,Qsem_soln)
-        return [zsem_soln,Vsem_soln,zgap_soln,Vgap_soln,zvac_soln,Vvac_soln,zmet_soln,Vmet_soln]
-
-    # Then parallelize the calculations for every zins
-    result = Parallel(n_jobs=-1)(
-        delayed(compute)(zins) for zins in zins_AFMarray
-    )
-    return [
-        np.asarray([zsem_soln for zsem_soln,Vsem_soln,zgap_soln,Vgap_soln,zvac_soln,Vvac_soln,zmet_soln,Vmet_soln in result]),
-        np.asarray([Vsem_soln for zsem_soln,Vsem_soln,zgap_soln,Vgap_soln,zvac_soln,Vvac_soln,zmet_soln,Vmet_soln in result]),
-        np.asarray([zgap_soln for zsem_soln,Vsem_soln,zgap_soln,Vgap_soln,zvac_soln,Vvac_soln,zmet_soln,Vmet_soln in result]),
-        np.asarray([Vgap_soln for zsem_soln,Vsem_soln,zgap_soln,Vgap_soln,zvac_soln,Vvac_soln,zmet_soln,Vmet_soln in result]),
-        np.asarray([zvac_soln for zsem_soln,Vsem_soln,zgap_soln,Vgap_soln,zvac_soln,Vvac_soln,zmet_soln,Vmet_soln in result]),
-        np.asarray([Vvac_soln for zsem_soln,Vsem_soln,zgap_soln,Vgap_soln,zvac_soln,Vvac_soln,zmet_soln,Vmet_soln in result]),
-        np.asarray([zmet_soln for zsem_soln,Vsem_soln,zgap_soln,Vgap_soln,zvac_soln,Vvac_soln,zmet_soln,Vmet_soln in result]),
-        np.asarray([Vmet_soln for zsem_soln,Vsem_soln,zgap_soln,Vgap_soln,zvac_soln,Vvac_soln,zmet_soln,Vmet_soln in result]),
-    ]
+    # Solve Vs for every zins at once, with Fermi-Dirac statistics as in Surface_calculations
+    eta = Physics_Semiconductors.Func_eta(Ec,Ev,Ef,T)
+    Vs_AFMarray = Physics_Semiconductors.Func_Vs_batch(Vg,zins_AFMarray,CPD,Na,Nd,epsilon_sem,T,nb,pb,ni, eta=eta)
 
+    # Then the band bending and band diagram for every zins at once, one row per zins
+    zsem_AFMarray,Vsem_AFMarray,Esem_AFMarray,Qsem_AFMarray = Physics_BandDiagram.BandBending_batch(T,epsilon_sem,nb,pb,Vs_AFMarray, eta)
+    zgap_AFMarray,Vgap_AFMarray,zvac_AFMarray,Vvac_AFMarray,zmet_AFMarray,Vmet_AFMarray,zarray_AFMarray,Earray_AFMarray,Qarray_AFMarray = Physics_BandDiagram.BandDiagram(Vg,zins_AFMarray,T,Nd,Na,WFmet,EAsem,epsilon_sem, ni,nb,pb,Vs_AFMarray,Ec,Ev,Ef,Ei,Eg,CPD, zsem_AFMarray,Vsem_AFMarray,Esem_AFMarray,Qsem_AFMarray)
+    return [zsem_AFMarray,Vsem_AFMarray,zgap_AFMarray,Vgap_AFMarray,zvac_AFMarray,Vvac_AFMarray,zmet_AFMarray,Vmet_AFMarray]
 
-################################################################################
 
-def AFM_banddiagrams(zins_AFMarray,Vg,T,Nd,Na,WFmet,EAsem,epsilon_sem, ni,nb,pb,Vs,Ec,Ev,Ei,Ef,Eg,CPD):
+def AFM_banddiagramarrays(zins_AFMarray,Vg,T,Nd,Na,WFmet,EAsem,epsilon_sem, ni,nb,pb,Vs,Ec,Ev,Ei,Ef,Eg,CPD):
 
-    # Calculate list any functions that are not constant as a function of zins
-    def compute(zins_variable):
-        Vs_soln = Physics_Semiconductors.Func_Vs(Vg,zins_variable,CPD,Na,Nd,epsilon_sem,T,nb,pb,ni)
-        zsem_soln, Vsem_soln, Esem_soln, Qsem_soln = Physics_BandDiagram.BandBending(T,epsilon_sem,nb,pb,Vs_soln)
-        zgap_soln,Vgap_soln,zvac_soln,Vvac_soln,zmet_soln,Vmet_soln,zarray_soln,Earray_soln,Qarray_soln  = Physics_BandDiagram.BandDiagram(Vg,zins_variable,T,Nd,Na,WFmet,EAsem,epsilon_sem, ni,nb,pb,Vs_soln,Ec,Ev,Ef,Ei,Eg,CPD, zsem_soln,Vsem_soln,Esem_soln,Qsem_soln)
-        return [zsem_soln,Vsem_soln,zgap_soln,Vgap_soln,zvac_soln,Vvac_soln,zmet_soln,Vmet_soln]
-
-    # Then parallelize the calculations for every zins
-    result = Parallel(n_jobs=-1)(
-        delayed(compute)(zins) for zins in zins_AFMarray
-    )
-    return [
-        np.asarray([zsem_soln for zsem_soln,Vsem_soln,zgap_soln,Vgap_soln,zvac_soln,Vvac_soln,zmet_soln,Vmet_soln in result]),
-        np.asarray([Vsem_soln for zsem_soln,Vsem_soln,zgap_soln,Vgap_soln,zvac_soln,Vvac_soln,zmet_soln,Vmet_soln in result]),
-        np.asarray([zgap_soln for zsem_soln,Vsem_soln,zgap_soln,Vgap_soln,zvac_soln,Vvac_soln,zmet_soln,Vmet_soln in result]),
-        np.asarray([Vgap_soln for zsem_soln,Vsem_soln,zgap_soln,Vgap_soln,zvac_soln,Vvac_soln,zmet_soln,Vmet_soln in result]),
-        np.asarray([zvac_soln for zsem_soln,Vsem_soln,zgap_soln,Vgap_soln,zvac_soln,Vvac_soln,zmet_soln,Vmet_soln in result]),
-        np.asarray([Vvac_soln for zsem_soln,Vsem_soln,zgap_soln,Vgap_soln,zvac_soln,Vvac_soln,zmet_soln,Vmet_soln in result]),
-        np.asarray([zmet_soln for zsem_soln,Vsem_soln,zgap_soln,Vgap_soln,zvac_soln,Vvac_soln,zmet_soln,Vmet_soln in result]),
-        np.asarray([Vmet_soln for zsem_soln,Vsem_soln,zgap_soln,Vgap_soln,zvac_soln,Vvac_soln,zmet_soln,Vmet_soln, in result]),
-    ]
+    # Solve Vs for every zins at once, with Fermi-Dirac statistics as in Surface_calculations
+    eta = Physics_Semiconductors.Func_eta(Ec,Ev,Ef,T)
+    Vs_AFMarray = Physics_Semiconductors.Func_Vs_batch(Vg,zins_AFMarray,CPD,Na,Nd,epsilon_sem,T,nb,pb,ni, eta=eta)
 
+    # Then the band bending and band diagram for every zins at once, one row per zins
+    zsem_AFMarray,Vsem_AFMarray,Esem_AFMarray,Qsem_AFMarray = Physics_BandDiagram.BandBending_batch(T,epsilon_sem,nb,pb,Vs_AFMarray, eta)
+    zgap_AFMarray,Vgap_AFMarray,zvac_AFMarray,Vvac_AFMarray,zmet_AFMarray,Vmet_AFMarray,zarray_AFMarray,Earray_AFMarray,Qarray_AFMarray = Physics_BandDiagram.BandDiagram(Vg,zins_AFMarray,T,Nd,Na,WFmet,EAsem,epsilon_sem, ni,nb,pb,Vs_AFMarray,Ec,Ev,Ef,Ei,Eg,CPD, zsem_AFMarray,Vsem_AFMarray,Esem_AFMarray,Qsem_AFMarray)
+    return [zsem_AFMarray,Vsem_AFMarray,zgap_AFMarray,Vgap_AFMarray,zvac_AFMarray,Vvac_AFMarray,zmet_AFMarray,Vmet_AFMarray,zarray_AFMarray,Qarray_AFMarray,Earray_AFMarray]
 
-def AFM_banddiagramarrays(zins_AFMarray,Vg,T,Nd,Na,WFmet,EAsem,epsilon_sem, ni,nb,pb,Vs,Ec,Ev,Ei,Ef,Eg,CPD):
+################################################################################
 
-    # Calculate list any functions that are not constant as a function of zins
-    def compute(zins_variable):
-        Vs_soln = Physics_Semiconductors.Func_Vs(Vg,zins_variable,CPD,Na,Nd,epsilon_sem,T,nb,pb,ni)
-        zsem_soln, Vsem_soln, Esem_soln, Qsem_soln = Physics_BandDiagram.BandBending(T,epsilon_sem,nb,pb,Vs_soln)
-        zgap_soln,Vgap_soln,zvac_soln,Vvac_soln,zmet_soln,Vmet_soln,zarray_soln,Earray_soln,Qarray_soln  = Physics_BandDiagram.BandDiagram(Vg,zins_variable,T,Nd,Na,WFmet,EAsem,epsilon_sem, ni,nb,pb,Vs_soln,Ec,Ev,Ef,Ei,Eg,CPD, zsem_soln,Vsem_soln,Esem_soln,Qsem_soln)
-        return [zsem_soln,Vsem_soln,zgap_soln,Vgap_soln,zvac_soln,Vvac_soln,zmet_soln,Vmet_soln,zarray_soln,Qarray_soln,Earray_soln]
-
-    # Then parallelize the calculations for every zins
-    result = Parallel(n_jobs=-1)(
-        delayed(compute)(zins) for zins in zins_AFMarray
-    )
-    return [
-        np.asarray([zsem_soln for zsem_soln,Vsem_soln,zgap_soln,Vgap_soln,zvac_soln,Vvac_soln,zmet_soln,Vmet_soln,zarray_soln,Earray_soln,Qarray_soln in result]),
-        np.asarray([Vsem_soln for zsem_soln,Vsem_soln,zgap_soln,Vgap_soln,zvac_soln,Vvac_soln,zmet_soln,Vmet_soln,zarray_soln,Earray_soln,Qarray_soln in result]),
-        np.asarray([zgap_soln for zsem_soln,Vsem_soln,zgap_soln,Vgap_soln,zvac_soln,Vvac_soln,zmet_soln,Vmet_soln,zarray_soln,Earray_soln,Qarray_soln in result]),
-        np.asarray([Vgap_soln for zsem_soln,Vsem_soln,zgap_soln,Vgap_soln,zvac_soln,Vvac_soln,zmet_soln,Vmet_soln,zarray_soln,Earray_soln,Qarray_soln in result]),
-        np.asarray([zvac_soln for zsem_soln,Vsem_soln,zgap_soln,Vgap_soln,zvac_soln,Vvac_soln,zmet_soln,Vmet_soln,zarray_soln,Earray_soln,Qarray_soln in result]),
-        np.asarray([Vvac_soln for zsem_soln,Vsem_soln,zgap_soln,Vgap_soln,zvac_soln,Vvac_soln,zmet_soln,Vmet_soln,zarray_soln,Earray_soln,Qarray_soln in result]),
-        np.asarray([zmet_soln for zsem_soln,Vsem_soln,zgap_soln,Vgap_soln,zvac_soln,Vvac_soln,zmet_soln,Vmet_soln,zarray_soln,Earray_soln,Qarray_soln in result]),
-        np.asarray([Vmet_soln for zsem_soln,Vsem_soln,zgap_soln,Vgap_soln,zvac_soln,Vvac_soln,zmet_soln,Vmet_soln,zarray_soln,Earray_soln,Qarray_soln in result]),
-        np.asarray([zarray_soln for zsem_soln,Vsem_soln,zgap_soln,Vgap_soln,zvac_soln,Vvac_soln,zmet_soln,Vmet_soln,zarray_soln,Earray_soln,Qarray_soln in result]),
-        np.asarray([Earray_soln for zsem_soln,Vsem_soln,zgap_soln,Vgap_soln,zvac_soln,Vvac_soln,zmet_soln,Vmet_soln,zarray_soln,Earray_soln,Qarray_soln in result]),
-        np.asarray([Qarray_soln for zsem_soln,Vsem_soln,zgap_soln,Vgap_soln,zvac_soln,Vvac_soln,zmet_soln,Vmet_soln,zarray_soln,Earray_soln,Qarray_soln in result]),
-    ]
+def Sweep_continuation(compute, sweep_array, continuation=True):
+
+    # compute(sweep_variable, guesses) returns [results, solutions] for one point of a sweep,
+    # where solutions is a list of Vs arrays (None for any not computed) and guesses is a matching list (or None).
+    # With continuation, the sweep is cut into one chunk per worker (a single chunk when run serially),
+    # and each chunk is walked in order, seeding every point by linear extrapolation from the solutions
+    # at the two points before it.
+    def compute_chunk(sweep_chunk):
+        results = []
+        previous = []
+        for sweep_variable in sweep_chunk:
+            if len(previous) == 2 and previous[0][0] != previous[1][0]:
+                (x0,solutions0),(x1,solutions1) = previous
+                guesses = [None if s1 is None else s1+(s1-s0)*(sweep_variable-x1)/(x1-x0) for s0,s1 in zip(solutions0,solutions1)]
+            elif len(previous) >= 1: # a repeated sweep value has no slope, so the last solution is the guess
+                guesses = previous[-1][1]
+            else:
+                guesses = None
+            result, solutions = compute(sweep_variable, guesses)
+            previous = (previous+[(sweep_variable,solutions)])[-2:]
+            results.append(result)
+        return results
+
+    # Then parallelize the calculations, one chunk (or, without continuation, one point) per job
+    if continuation:
+        return Organization_Executor.Executor_map(compute_chunk, sweep_array, chunks=True)
+    return Organization_Executor.Executor_map(lambda sweep_variable: compute_chunk([sweep_variable])[0], sweep_array)
 
 ################################################################################
 
-def AFM_biasarrays(Vg_array,zins,Na,Nd,epsilon_sem,T,CPD,LD,nb,pb,ni,frequency,springconst,amplitude,Qfactor,tipradius,time_AFMarray,zins_AFMarray,zinslag_AFMarray,cantheight,cantarea,timesteps,geometrybuttons):
-
-    # Calculate list any functions that are not constant as a function of Vg
-    def compute(Vg_variable):
-        Vs_AFMarray_soln,Es_AFMarray_soln,Qs_AFMarray_soln,F_AFMarray_soln,P_AFMarray_soln = AFM_timearrays(time_AFMarray,zins_AFMarray,zinslag_AFMarray,Vg_variable,zins,Na,Nd,epsilon_sem,T,CPD,LD,nb,pb,ni)
-        Vscant_AFMarray_soln,Escant_AFMarray_soln,Qscant_AFMarray_soln,Fcant_AFMarray_soln,Pcant_AFMarray_soln = AFM_timearrays(time_AFMarray,zins_AFMarray+cantheight,zinslag_AFMarray+cantheight,Vg_variable,zins+cantheight,Na,Nd,epsilon_sem,T,CPD,LD,nb,pb,ni)
-        Vs_soln = Vs_AFMarray_soln[int(timesteps/2)]
-        F_soln = F_AFMarray_soln[int(timesteps/2)]
-        Fcant_soln = Fcant_AFMarray_soln[int(timesteps/2)]
-        DP_soln = max(P_AFMarray_soln)-min(P_AFMarray_soln)
-        df_soln,dg_soln = Physics_ncAFM.dfdg(time_AFMarray,F_AFMarray_soln,Fcant_AFMarray_soln,frequency,springconst,amplitude,Qfactor,tipradius,cantarea,geometrybuttons)
-        return [Vs_soln,F_soln,DP_soln,df_soln,dg_soln]
-
-    # Then parallelize the calculations for every Vg
-    result = Parallel(n_jobs=-1)(
-        delayed(compute)(Vg) for Vg in Vg_array
-    )
-    return [
-        np.asarray([Vs_soln for Vs_soln,F_soln,DP_soln,df_soln,dg_soln in result]),
-        np.asarray([F_soln  for Vs_soln,F_soln,DP_soln,df_soln,dg_soln in result]),
-        np.asarray([DP_soln for Vs_soln,F_soln,DP_soln,df_soln,dg_soln in result]),
-        np.asarray([df_soln for Vs_soln,F_soln,DP_soln,df_soln,dg_soln in result]),
-        np.asarray([dg_soln for Vs_soln,F_soln,DP_soln,df_soln,dg_soln in result]),
-    ]
+# Requested quantities at every Vg of a bias sweep (AFM_biasarrays, All_biasarrays)
+    # Every point is built from AFM_rules, walking the sweep by continuation. df, dg and the harmonic
+    # spectrum of the force ('harmonics', Physics_ncAFM.harmonics, one row per Vg) are not built per point:
+    # each point returns its force oscillations instead, and the whole (bias x time) force matrix goes
+    # through one rFFT at the end, which gives all three.
+def AFM_biassweep(Vg_array,zins,Na,Nd,epsilon_sem,T,CPD,LD,nb,pb,ni,eta,frequency,springconst,amplitude,Qfactor,tipradius,time_AFMarray,zins_AFMarray,zinslag_AFMarray,cantheight,cantarea,timesteps,geometrybuttons, continuation, names):
+    forces = []
+    if any(name in names for name in ('df','dg','harmonics')):
+        forces = ['F_AFMarray']+(['Fcant_AFMarray'] if 2 in geometrybuttons else [])
+    pointwise = [name for name in names if name not in ('df','dg','harmonics')]+forces
+    def compute(Vg_variable, guesses):
+        rules = AFM_rules(time_AFMarray,zins_AFMarray,zinslag_AFMarray,Vg_variable,zins,Na,Nd,epsilon_sem,T,CPD,LD,nb,pb,ni,eta,frequency,springconst,amplitude,Qfactor,tipradius,cantheight,cantarea,timesteps,geometrybuttons, guesses=guesses, outputs=names)
+        values = Builder_evaluate(rules, {}, pointwise)
+        return [values[name] for name in pointwise], [values.get('Vs_AFMarray'),values.get('Vscant_AFMarray')]
+
+    # Then parallelize the calculations for every Vg, walking the sweep in order within each worker
+    result = Sweep_continuation(compute, Vg_array, continuation)
+    values = {name: np.asarray([point[i] for point in result]) for i,name in enumerate(pointwise)}
+    if forces:
+        values['harmonics'] = Physics_ncAFM.harmonics(values['F_AFMarray'],values.get('Fcant_AFMarray',0),tipradius,cantarea,geometrybuttons)
+        values['df'], values['dg'] = Physics_ncAFM.dfdg_harmonics(values['harmonics'],frequency,springconst,amplitude,Qfactor)
+    return values
+
+def AFM_biasarrays(Vg_array,zins,Na,Nd,epsilon_sem,T,CPD,LD,nb,pb,ni,eta,frequency,springconst,amplitude,Qfactor,tipradius,time_AFMarray,zins_AFMarray,zinslag_AFMarray,cantheight,cantarea,timesteps,geometrybuttons, continuation=True, outputs=None):
+
+    # Calculate the requested functions that are not constant as a function of Vg
+    default = ['Vs','F','DP','df','dg']
+    values = AFM_biassweep(Vg_array,zins,Na,Nd,epsilon_sem,T,CPD,LD,nb,pb,ni,eta,frequency,springconst,amplitude,Qfactor,tipradius,time_AFMarray,zins_AFMarray,zinslag_AFMarray,cantheight,cantarea,timesteps,geometrybuttons, continuation, outputs or default)
+    return Builder_outputs(values, outputs, default)
 
 
 ################################################################################
 ################################################################################
 
-def All_biasarrays(Vg_array,zins,Na,Nd,epsilon_sem,T,CPD,LD,nb,pb,ni,frequency,springconst,amplitude,Qfactor,tipradius,time_AFMarray,zins_AFMarray,zinslag_AFMarray,cantheight,cantarea,timesteps,geometrybuttons):
-
-    # Calculate list any functions that are not constant as a function of Vg
-    def compute(Vg_variable):
-        Vs_AFMarray_soln,Es_AFMarray_soln,Qs_AFMarray_soln,F_AFMarray_soln,P_AFMarray_soln = AFM_timearrays(time_AFMarray,zins_AFMarray,zinslag_AFMarray,Vg_variable,zins,Na,Nd,epsilon_sem,T,CPD,LD,nb,pb,ni)
-        Vs_soln = Vs_AFMarray_soln[int(timesteps/2)]
-        F_soln = F_AFMarray_soln[int(timesteps/2)]
-        P_soln = P_AFMarray_soln[int(timesteps/2)]       
-        Vscant_AFMarray_soln,Escant_AFMarray_soln,Qscant_AFMarray_soln,Fcant_AFMarray_soln,Pcant_AFMarray_soln = AFM_timearrays(time_AFMarray,zins_AFMarray+cantheight,zinslag_AFMarray+cantheight,Vg_variable,zins+cantheight,Na,Nd,epsilon_sem,T,CPD,LD,nb,pb,ni)
-        Vscant_soln = Vscant_AFMarray_soln[int(timesteps/2)]
-        Fcant_soln = Fcant_AFMarray_soln[int(timesteps/2)]
-        Pcant_soln = Pcant_AFMarray_soln[int(timesteps/2)] 
-        f_soln = Physics_Semiconductors.Func_f(T,Vs_soln,nb,pb)
-        Es_soln = Physics_Semiconductors.Func_E(nb,pb,Vs_soln,epsilon_sem,T,f_soln)
-        Qs_soln = Physics_Semiconductors.Func_Q(epsilon_sem,Es_soln)
-        df_soln,dg_soln = Physics_ncAFM.dfdg(time_AFMarray,F_AFMarray_soln,Fcant_AFMarray_soln,frequency,springconst,amplitude,Qfactor,tipradius,cantarea,geometrybuttons)
-        return [Vs_soln,F_soln,P_soln,Vscant_soln,Fcant_soln,Pcant_soln,Es_soln,Qs_soln,df_soln,dg_soln]
-    
-    # Then parallelize the calculations for every Vg
-    result = Parallel(n_jobs=-1)(
-        delayed(compute)(Vg) for Vg in Vg_array
-    )
-    return [
-        np.asarray([Vs_soln for Vs_soln,F_soln,P_soln,Vscant_soln,Fcant_soln,Pcant_soln,Es_soln,Qs_soln,df_soln,dg_soln in result]),
-        np.asarray([F_soln for Vs_soln,F_soln,P_soln,Vscant_soln,Fcant_soln,Pcant_soln,Es_soln,Qs_soln,df_soln,dg_soln in result]),
-        np.asarray([P_soln for Vs_soln,F_soln,P_soln,Vscant_soln,Fcant_soln,Pcant_soln,Es_soln,Qs_soln,df_soln,dg_soln in result]),
-        np.asarray([Vscant_soln for Vs_soln,F_soln,P_soln,Vscant_soln,Fcant_soln,Pcant_soln,Es_soln,Qs_soln,df_soln,dg_soln in result]),
-        np.asarray([Fcant_soln for Vs_soln,F_soln,P_soln,Vscant_soln,Fcant_soln,Pcant_soln,Es_soln,Qs_soln,df_soln,dg_soln in result]),
-        np.asarray([Pcant_soln for Vs_soln,F_soln,P_soln,Vscant_soln,Fcant_soln,Pcant_soln,Es_soln,Qs_soln,df_soln,dg_soln in result]),
-        np.asarray([Es_soln for Vs_soln,F_soln,P_soln,Vscant_soln,Fcant_soln,Pcant_soln,Es_soln,Qs_soln,df_soln,dg_soln in result]),
-        np.asarray([Qs_soln for Vs_soln,F_soln,P_soln,Vscant_soln,Fcant_soln,Pcant_soln,Es_soln,Qs_soln,df_soln,dg_soln in result]),
-        np.asarray([df_soln for Vs_soln,F_soln,P_soln,Vscant_soln,Fcant_soln,Pcant_soln,Es_soln,Qs_soln,df_soln,dg_soln in result]),
-        np.asarray([dg_soln for Vs_soln,F_soln,P_soln,Vscant_soln,Fcant_soln,Pcant_soln,Es_soln,Qs_soln,df_soln,dg_soln in result])
-    ]
+def All_biasarrays(Vg_array,zins,Na,Nd,epsilon_sem,T,CPD,LD,nb,pb,ni,eta,frequency,springconst,amplitude,Qfactor,tipradius,time_AFMarray,zins_AFMarray,zinslag_AFMarray,cantheight,cantarea,timesteps,geometrybuttons, continuation=True, outputs=None):
+
+    # Calculate the requested functions that are not constant as a function of Vg
+    default = ['Vs','F','P','Vscant','Fcant','Pcant','Es','Qs','df','dg']
+    values = AFM_biassweep(Vg_array,zins,Na,Nd,epsilon_sem,T,CPD,LD,nb,pb,ni,eta,frequency,springconst,amplitude,Qfactor,tipradius,time_AFMarray,zins_AFMarray,zinslag_AFMarray,cantheight,cantarea,timesteps,geometrybuttons, continuation, outputs or default)
+    return Builder_outputs(values, outputs, default)
 
 ################################################################################
 
-def All_zinsarrays(Vg,zins,zins_array,Na,Nd,epsilon_sem,T,CPD,LD,nb,pb,ni,frequency,springconst,amplitude,Qfactor,tipradius,time_AFMarray,zins_AFMarray,zinslag_AFMarray,cantheight,cantarea,timesteps,geometrybuttons):
-
-    # Calculate list any functions that are not constant as a function of zins
-    def compute(zins_variable):
-        Vs_AFMarray_soln,Es_AFMarray_soln,Qs_AFMarray_soln,F_AFMarray_soln,P_AFMarray_soln = AFM_timearrays(time_AFMarray,zins_AFMarray-zins+zins_variable,zinslag_AFMarray-zins+zins_variable,Vg,zins-zins+zins_variable,Na,Nd,epsilon_sem,T,CPD,LD,nb,pb,ni)
-        Vs_soln = Vs_AFMarray_soln[int(timesteps/2)]
-        F_soln = F_AFMarray_soln[int(timesteps/2)]
-        P_soln = P_AFMarray_soln[int(timesteps/2)]       
-        Vscant_AFMarray_soln,Escant_AFMarray_soln,Qscant_AFMarray_soln,Fcant_AFMarray_soln,Pcant_AFMarray_soln = AFM_timearrays(time_AFMarray,zins_AFMarray+cantheight-zins+zins_variable,zinslag_AFMarray+cantheight-zins+zins_variable,Vg,zins+cantheight-zins+zins_variable,Na,Nd,epsilon_sem,T,CPD,LD,nb,pb,ni)
-        Vscant_soln = Vscant_AFMarray_soln[int(timesteps/2)]
-        Fcant_soln = Fcant_AFMarray_soln[int(timesteps/2)]
-        Pcant_soln = Pcant_AFMarray_soln[int(timesteps/2)] 
-        f_soln = Physics_Semiconductors.Func_f(T,Vs_soln,nb,pb)
-        Es_soln = Physics_Semiconductors.Func_E(nb,pb,Vs_soln,epsilon_sem,T,f_soln)
-        Qs_soln = Physics_Semiconductors.Func_Q(epsilon_sem,Es_soln)
-        df_soln,dg_soln = Physics_ncAFM.dfdg(time_AFMarray,F_AFMarray_soln,Fcant_AFMarray_soln,frequency,springconst,amplitude,Qfactor,tipradius,cantarea,geometrybuttons)
-        return [Vs_soln,F_soln,P_soln,Vscant_soln,Fcant_soln,Pcant_soln,Es_soln,Qs_soln,df_soln,dg_soln]
-    
-    # Then parallelize the calculations for every zins
-    result = Parallel(n_jobs=-1)(
-        delayed(compute)(z) for z in zins_array
-    )
-    return [
-        np.asarray([Vs_soln for Vs_soln,F_soln,P_soln,Vscant_soln,Fcant_soln,Pcant_soln,Es_soln,Qs_soln,df_soln,dg_soln in result]),
-        np.asarray([F_soln for Vs_soln,F_soln,P_soln,Vscant_soln,Fcant_soln,Pcant_soln,Es_soln,Qs_soln,df_soln,dg_soln in result]),
-        np.asarray([P_soln for Vs_soln,F_soln,P_soln,Vscant_soln,Fcant_soln,Pcant_soln,Es_soln,Qs_soln,df_soln,dg_soln in result]),
-        np.asarray([Vscant_soln for Vs_soln,F_soln,P_soln,Vscant_soln,Fcant_soln,Pcant_soln,Es_soln,Qs_soln,df_soln,dg_soln in result]),
-        np.asarray([Fcant_soln for Vs_soln,F_soln,P_soln,Vscant_soln,Fcant_soln,Pcant_soln,Es_soln,Qs_soln,df_soln,dg_soln in result]),
-        np.asarray([Pcant_soln for Vs_soln,F_soln,P_soln,Vscant_soln,Fcant_soln,Pcant_soln,Es_soln,Qs_soln,df_soln,dg_soln in result]),
-        np.asarray([Es_soln for Vs_soln,F_soln,P_soln,Vscant_soln,Fcant_soln,Pcant_soln,Es_soln,Qs_soln,df_soln,dg_soln in result]),
-        np.asarray([Qs_soln for Vs_soln,F_soln,P_soln,Vscant_soln,Fcant_soln,Pcant_soln,Es_soln,Qs_soln,df_soln,dg_soln in result]),
-        np.asarray([df_soln for Vs_soln,F_soln,P_soln,Vscant_soln,Fcant_soln,Pcant_soln,Es_soln,Qs_soln,df_soln,dg_soln in result]),
-        np.asarray([dg_soln for Vs_soln,F_soln,P_soln,Vscant_soln,Fcant_soln,Pcant_soln,Es_soln,Qs_soln,df_soln,dg_soln in result])
-    ]
+def All_zinsarrays(Vg,zins,zins_array,Na,Nd,epsilon_sem,T,CPD,LD,nb,pb,ni,eta,frequency,springconst,amplitude,Qfactor,tipradius,time_AFMarray,zins_AFMarray,zinslag_AFMarray,cantheight,cantarea,timesteps,geometrybuttons, solver='inverse', outputs=None):
+
+    # At fixed Vg, Vs depends on zins alone, so every oscillation of the sweep, tip and cantilever, samples
+    # the same curve Vs(zins) over [min zins, max zins + 2*amplitude + cantheight]. All of them are solved
+    # together (AFM_timearrays with heights), one row per zins; by default (solver='inverse') from a single table of that
+    # curve (Func_Vs_inverse), interpolated at every point, instead of root-finding at each.
+    default = ['Vs','F','P','Vscant','Fcant','Pcant','Es','Qs','df','dg']
+    names = outputs or default
+    trajectories = [0]
+    if any(name.endswith('cant') for name in names) or (2 in geometrybuttons and any(name in names for name in ('df','dg','harmonics'))):
+        trajectories.append(cantheight)
+    zinslag = np.asarray(zins_array)[:,None]+(zinslag_AFMarray-zins)
+    values = AFM_timearrays(time_AFMarray,None,zinslag,Vg,zins_array,Na,Nd,epsilon_sem,T,CPD,LD,nb,pb,ni,eta, solver, outputs=['Vs','Es','Qs','F','P'], heights=trajectories)
+
+    # Then the values at the bottom of each oscillation, and df, dg and the force harmonics (one row per zins)
+    result = {}
+    for i, suffix in enumerate(['', 'cant'][:len(trajectories)]):
+        for name in ['Vs','Es','Qs','F','P']:
+            result[name+suffix] = values[name][i,:,int(timesteps/2)]
+    if any(name in names for name in ('df','dg','harmonics')):
+        F_AFMarray = values['F'][0]
+        Fcant_AFMarray = values['F'][-1] if 2 in geometrybuttons else 0
+        result['harmonics'] = Physics_ncAFM.harmonics(F_AFMarray,Fcant_AFMarray,tipradius,cantarea,geometrybuttons)
+        result['df'], result['dg'] = Physics_ncAFM.dfdg_harmonics(result['harmonics'],frequency,springconst,amplitude,Qfactor)
+    return Builder_outputs(result, outputs, default)
+
+################################################################################
+
+def AFM_maparrays(Vg_array,zins,zins_array,Na,Nd,epsilon_sem,T,CPD,LD,nb,pb,ni,eta,frequency,springconst,amplitude,Qfactor,tipradius,time_AFMarray,zins_AFMarray,zinslag_AFMarray,cantheight,cantarea,timesteps,geometrybuttons, solver='inverse', outputs=None):
+
+    # Spectroscopy map over (Vg x zins): every row is the zins sweep of All_zinsarrays at one Vg, so all the
+    # oscillations of a row, tip and cantilever, share one Vs(zins) table. Rows are independent, and are
+    # spread over the workers in one contiguous chunk each. Takes any outputs of All_zinsarrays, each
+    # returned as an array [Vg, zins] (or [Vg, zins, harmonic]).
+    default = ['Vs','F','df','dg']
+    names = outputs or default
+    def compute(Vg_chunk):
+        return [All_zinsarrays(Vg,zins,zins_array,Na,Nd,epsilon_sem,T,CPD,LD,nb,pb,ni,eta,frequency,springconst,amplitude,Qfactor,tipradius,time_AFMarray,zins_AFMarray,zinslag_AFMarray,cantheight,cantarea,timesteps,geometrybuttons, solver, outputs=names) for Vg in Vg_chunk]
+
+    # Then parallelize the calculations, one chunk of Vg rows per job
+    rows = Organization_Executor.Executor_map(compute, Vg_array, chunks=True)
+    return Builder_outputs({name: np.array([row[name] for row in rows]) for name in names}, outputs, default)
 
 
 
@@ -310,9 +361,7 @@ def VsFdfdg_delayarrays(delay_array,intensity_delayarray,steps,amplitude,frequen
         return [Vs_soln, F_soln, df_soln, dg_soln]
 
     # Then parallelize the calcylation of y for every x
-    result = Parallel(n_jobs=-1)(
-        delayed(compute)(intensity_variable) for intensity_variable in intensity_delayarray
-    )
+    result = Organization_Executor.Executor_map(compute, intensity_delayarray)
     return [
         [Vs_soln for Vs_soln, F_soln, df_soln, dg_soln in result],
         [F_soln for Vs_soln, F_soln, df_soln, dg_soln in result],
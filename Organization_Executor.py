@@ -0,0 +1,78 @@
+################################################################################
+################################################################################
+# This script decides how many processes the array builders get. Every fan-out
+# goes through Executor_map, so there is one worker budget for the whole app,
+# and a fan-out that is already running inside a worker runs serially instead of
+# starting a pool of its own.
+################################################################################
+################################################################################
+
+import os
+import threading
+from joblib import Parallel, delayed, cpu_count
+
+################################################################################
+################################################################################
+# Worker budget
+
+# Processes this app may keep busy at once. It is shared by every thread of the
+# process (e.g. concurrent callbacks). Under gunicorn each worker is its own
+# process, so set SEMICONDUCTORS_WORKERS to about cores/gunicorn workers there.
+workers = int(os.environ.get('SEMICONDUCTORS_WORKERS', cpu_count()))
+available = workers
+lock = threading.Lock()
+
+# True inside an Executor_map task, where nothing may fan out again
+local = threading.local()
+
+def Executor_acquire(numtasks):
+    global available
+    if getattr(local, 'nested', False):
+        return 0
+    with lock:
+        n = min(numtasks, available)
+        if n <= 1: # one process is no better than the caller's own thread
+            return 0
+        available -= n
+        return n
+
+def Executor_release(n):
+    global available
+    with lock:
+        available += n
+
+def Executor_task(compute, args):
+    local.nested = True
+    try:
+        return compute(*args)
+    finally:
+        local.nested = False
+
+################################################################################
+################################################################################
+# Fan-out
+
+# map(compute, *iterables) on as many processes as the budget allows right now
+    # With chunks, the single iterable is cut into one contiguous chunk per process,
+    # compute(chunk) returns a list of results per chunk, and the lists are joined in order.
+    # Runs in the calling thread when nested, when the budget is spent, or for a single task.
+def Executor_map(compute, *iterables, chunks=False):
+    tasks = list(zip(*iterables))
+    n = Executor_acquire(len(tasks))
+    try:
+        if chunks:
+            items = [item for item, in tasks]
+            size, extra = divmod(len(items), max(n, 1))
+            bounds = [i*size+min(i, extra) for i in range(max(n, 1)+1)]
+            tasks = [(items[a:b],) for a, b in zip(bounds[:-1], bounds[1:]) if b > a]
+        if n == 0:
+            result = [compute(*args) for args in tasks]
+        else:
+            result = Parallel(n_jobs=n)(
+                delayed(Executor_task)(compute, args) for args in tasks
+            )
+    finally:
+        Executor_release(n)
+    if chunks:
+        return [point for chunk in result for point in chunk]
+    return result
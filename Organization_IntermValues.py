@@ -1,4 +1,5 @@
 import numpy as np
+from functools import lru_cache
 
 import Physics_Semiconductors
 import Physics_BandDiagram
@@ -36,27 +37,53 @@ def Surface_inputvalues(slider_Vg,slider_zins,slider_alpha,slider_Eg,slider_epsi
 
 
 
-def Surface_calculations(Vg,zins,Eg,epsilon_sem,WFmet,EAsem,Nd,Na,mn,mp,T):
+def Surface_Efarray(Eg,Nd,Na,mn,mp,T):
+
+    # Fermi level over broadcastable arrays of bulk parameters (e.g. a T or doping sweep), in one solve
+    NC,NV = Physics_Semiconductors.Func_NCNV(T, mn, mp)
+    Ec,Ev = Physics_Semiconductors.Func_EcEv(Eg)
+    Ef = Physics_Semiconductors.Func_Ef_batch(NC, NV, Ec, Ev, T, Nd, Na)
+
+    return Ef
+
+
+
+# Bulk (material) state, independent of Vg and zins
+# Cached on the material parameters, so slider moves that only change Vg or zins skip the Ef solve.
+# All inputs are scalars and all outputs are floats (eta a tuple of them), so the cached values can be shared safely.
+# eta = ((Ef-Ec)/kT, (Ev-Ef)/kT) switches everything built on this state to Fermi-Dirac statistics.
+@lru_cache(maxsize=64)
+def Surface_bulkcalculations(Eg,epsilon_sem,WFmet,EAsem,Nd,Na,mn,mp,T, Ef=None):
 
     NC,NV = Physics_Semiconductors.Func_NCNV(T, mn, mp)
     Ec,Ev = Physics_Semiconductors.Func_EcEv(Eg)
     Ei = Physics_Semiconductors.Func_Ei(Ev, Ec, T, mn, mp)
-    Ef = Physics_Semiconductors.Func_Ef(NC, NV, Ec, Ev, T, Nd, Na)
+    if Ef is None: # otherwise taken from Surface_Efarray
+        Ef = Physics_Semiconductors.Func_Ef(NC, NV, Ec, Ev, T, Nd, Na)
     no,po = Physics_Semiconductors.Func_nopo(NC, NV, Ec, Ev, Ef, T)
     ni = Physics_Semiconductors.Func_ni(NC, NV, Eg, T)
     nb,pb = Physics_Semiconductors.Func_nbpb(Na, Nd, ni)
-    CPD,Ef,Ec,Ev,Ei = Physics_Semiconductors.Func_CPD(WFmet, EAsem, Ef, Eg, Ec, Ev, Ei, Na, Nd)   
+    CPD,Ef,Ec,Ev,Ei = Physics_Semiconductors.Func_CPD(WFmet, EAsem, Ef, Eg, Ec, Ev, Ei, Na, Nd)
     LD = Physics_Semiconductors.Func_LD(epsilon_sem,po,T)
-    Vs = Physics_Semiconductors.Func_Vs(Vg,zins,CPD,Na,Nd,epsilon_sem,T,nb,pb,ni)
-    f = Physics_Semiconductors.Func_f(T,Vs,nb,pb)
+    eta = Physics_Semiconductors.Func_eta(Ec,Ev,Ef,T)
+
+    return NC,NV,Ec,Ev,Ei,Ef,no,po,ni,nb,pb,CPD,LD,eta
+
+
+
+def Surface_calculations(Vg,zins,Eg,epsilon_sem,WFmet,EAsem,Nd,Na,mn,mp,T, Ef=None):
+
+    NC,NV,Ec,Ev,Ei,Ef,no,po,ni,nb,pb,CPD,LD,eta = Surface_bulkcalculations(Eg,epsilon_sem,WFmet,EAsem,Nd,Na,mn,mp,T, Ef)
+    Vs = Physics_Semiconductors.Func_Vs(Vg,zins,CPD,Na,Nd,epsilon_sem,T,nb,pb,ni, eta=eta)
+    f = Physics_Semiconductors.Func_f(T,Vs,nb,pb, eta)
     Es = Physics_Semiconductors.Func_E(nb,pb,Vs,epsilon_sem,T,f)
     Qs = Physics_Semiconductors.Func_Q(epsilon_sem,Es)
     F = Physics_Semiconductors.Func_F(Qs,CPD,Vg,zins)
     regime = Physics_Semiconductors.Func_regime(Na,Nd,Vs,Ei,Ef,Ec,Ev)
-    zsem, Vsem, Esem, Qsem = Physics_BandDiagram.BandBending(T,epsilon_sem,nb,pb,Vs)
+    zsem, Vsem, Esem, Qsem = Physics_BandDiagram.BandBending(T,epsilon_sem,nb,pb,Vs, eta)
     P = Physics_Semiconductors.Func_P(epsilon_sem,Es)
 
-    return NC,NV,Ec,Ev,Ei,Ef,no,po,ni,nb,pb,CPD,LD,Vs,Es,Qs,F,regime, zsem,Vsem,Esem,Qsem, P
+    return NC,NV,Ec,Ev,Ei,Ef,no,po,ni,nb,pb,CPD,LD,eta,Vs,Es,Qs,F,regime, zsem,Vsem,Esem,Qsem, P
 
 
 ################################################################################
@@ -0,0 +1,186 @@
+################################################################################
+################################################################################
+# This script runs a parameter sweep over any number of named axes at once, e.g.
+# Vg x zins x Nd x T. Work shared between points (bulk state, tip oscillation) is
+# done once per distinct value, every point that shares it is solved in one
+# vectorized call, and those calls are spread over the Organization_Executor
+# workers. Results come back as one N-D array per output, labelled by the axes.
+################################################################################
+################################################################################
+
+import numpy as np
+import pandas as pd
+
+import Presets
+import Organization_Executor
+import Organization_IntermValues
+import Organization_BuildArrays
+import Physics_Semiconductors
+import Physics_ncAFM
+
+################################################################################
+################################################################################
+# Axes and outputs
+
+# Axes are the slider inputs, in slider units (as in Presets and Organization_IntermValues),
+# grouped by what has to be recomputed when they change
+bulk_axes = ('Eg','epsilonsem','WFmet','EAsem','donor','acceptor','emass','hmass','T')
+afm_axes = ('amplitude','resfreq','lag','timesteps','tipradius','cantheight','cantarea','springconst','Qfactor')
+surface_axes = ('Vg','zins','alpha')
+
+# Outputs, in SI units as the builders return them (F per unit area)
+    # tip_outputs, cant_outputs: the surface under the tip and under the cantilever, at the bottom of
+    # the oscillation (as in All_biasarrays, so at zins and zins+cantheight when lag = 0)
+    # oscillation_outputs: df and dg (Physics_ncAFM.dfdg) and the swing in P over one oscillation
+tip_outputs = ('Vs','Es','Qs','F','P')
+cant_outputs = ('Vscant','Escant','Qscant','Fcant','Pcant')
+oscillation_outputs = ('df','dg','DP')
+
+# Most array elements (points x timesteps) solved in one call
+chunksize = 2**18
+
+# Slider values of a surface and an AFM preset, as the params of Sweep
+def Sweep_presets(surface_preset, afm_preset):
+    values = Presets.presets_surface(surface_preset,0,0,0,0,0,0,0,0,0,0,0,0,0)
+    params = dict(zip(('Vg','zins','Eg','epsilonsem','WFmet','EAsem','donor','acceptor','emass','hmass','T','alpha'), values[1:13]))
+    values = Presets.presets_afm(afm_preset,0,0,0,0,0,0,0,0,0,0)
+    params.update(zip(('timesteps','amplitude','resfreq','lag','springconst','tipradius','cantheight','cantarea','Qfactor','geometrybuttons'), values))
+    return params
+
+# Builder inputs (SI units) at the settings of params, for insulator thickness zins (slider units)
+def Sweep_inputs(params, zins):
+    inputs = Organization_IntermValues.Surface_inputvalues(0,zins,params['alpha'],*[params[name] for name in bulk_axes],2,2)
+    zins,Eg,epsilon_sem,WFmet,EAsem,Nd,Na,mn,mp,T = inputs[1:11]
+    NC,NV,Ec,Ev,Ei,Ef,no,po,ni,nb,pb,CPD,LD,eta = Organization_IntermValues.Surface_bulkcalculations(Eg,epsilon_sem,WFmet,EAsem,Nd,Na,mn,mp,T)
+    amplitude,frequency,lag,timesteps,tipradius,cantheight,cantarea,time_AFMarray,zins_AFMarray,zinslag_AFMarray = Organization_IntermValues.AFM1_inputvalues(params['amplitude'],params['resfreq'],params['lag'],int(params['timesteps']),params['tipradius'],params['cantheight'],params['cantarea'], zins)
+    springconst,Qfactor = Organization_IntermValues.AFM2_inputvalues(params['springconst'],params['Qfactor'])
+    return zins,Na,Nd,epsilon_sem,T,CPD,LD,nb,pb,ni,eta,frequency,springconst,amplitude,Qfactor,tipradius,lag,time_AFMarray,zins_AFMarray,zinslag_AFMarray,cantheight,cantarea,timesteps
+
+# Gate bias (J) of slider values Vg at the settings of params, as Surface_inputvalues converts it
+def Sweep_Vg(params, Vg):
+    return np.asarray(Vg, dtype=float)*(1-params['alpha'])*Physics_Semiconductors.e #J
+
+# Fewest timesteps that resolve df and dg to df_tol (Hz) and dg_tol (meV) at the settings of params,
+# for the gate biases Vg at insulator thickness zins (slider units), by Organization_BuildArrays.AFM_quadrature.
+    # Returns [timesteps, df_error, dg_error, converged], so e.g. params['timesteps'] = Sweep_timesteps(...)[0].
+    # params['timesteps'] is not used (it may be None).
+def Sweep_timesteps(params, Vg, zins, df_tol=1e-3, dg_tol=1e-3):
+    zins,Na,Nd,epsilon_sem,T,CPD,LD,nb,pb,ni,eta,frequency,springconst,amplitude,Qfactor,tipradius,lag,time_AFMarray,zins_AFMarray,zinslag_AFMarray,cantheight,cantarea,timesteps = Sweep_inputs(dict(params, timesteps=2), zins)
+    return Organization_BuildArrays.AFM_quadrature(Sweep_Vg(params, Vg),zins,Na,Nd,epsilon_sem,T,CPD,LD,nb,pb,ni,eta,frequency,springconst,amplitude,Qfactor,tipradius,lag,cantheight,cantarea,params['geometrybuttons'], df_tol, dg_tol)
+
+# Spectroscopy map over the grid Vg x zins (slider units) at the settings of params,
+# by Organization_BuildArrays.AFM_maparrays (one shared Vs(zins) table per Vg row, rows spread over the workers).
+    # outputs: any outputs of All_zinsarrays (default Vs, F, df, dg).
+    # Returns {'axes': {'Vg': Vg, 'zins': zins}, output: array [Vg, zins]} in SI units, like Sweep.
+def Sweep_map(params, Vg, zins, outputs=('Vs','F','df','dg')):
+    zins_OG,Na,Nd,epsilon_sem,T,CPD,LD,nb,pb,ni,eta,frequency,springconst,amplitude,Qfactor,tipradius,lag,time_AFMarray,zins_AFMarray,zinslag_AFMarray,cantheight,cantarea,timesteps = Sweep_inputs(params, params['zins'])
+    zins_array = np.asarray(zins, dtype=float)*1e-9 #m
+    result = Organization_BuildArrays.AFM_maparrays(Sweep_Vg(params, Vg),zins_OG,zins_array,Na,Nd,epsilon_sem,T,CPD,LD,nb,pb,ni,eta,frequency,springconst,amplitude,Qfactor,tipradius,time_AFMarray,zins_AFMarray,zinslag_AFMarray,cantheight,cantarea,timesteps,params['geometrybuttons'], outputs=list(outputs))
+    result['axes'] = {'Vg': np.asarray(Vg, dtype=float), 'zins': np.asarray(zins, dtype=float)}
+    return result
+
+################################################################################
+################################################################################
+# Sweep
+
+# Every output for a block of points that share their material and oscillation
+    # material and oscillation are the bulk and AFM values from Sweep, Vg (J) and zins (m) one entry per point.
+def Sweep_points(material, oscillation, Vg, zins, outputs, geometrybuttons):
+    Na,Nd,epsilon_sem,T,CPD,LD,nb,pb,ni,eta = material
+    amplitude,frequency,timesteps,tipradius,cantheight,cantarea,time_AFMarray,zinslag_AFMarray,springconst,Qfactor = oscillation
+    bottom = zinslag_AFMarray[int(timesteps/2)] # offset of the lagged position from zins there
+    result = {}
+
+    # Tip and cantilever, each only if needed, stacked in one pass (AFM_timearrays with heights)
+    elements = [(height, names) for height, names in [(0, tip_outputs), (cantheight, cant_outputs)] if any(name in outputs for name in names)]
+    if elements:
+        values = Organization_BuildArrays.AFM_timearrays(None,None,zins+bottom,Vg,zins,Na,Nd,epsilon_sem,T,CPD,LD,nb,pb,ni,eta, heights=[height for height, names in elements])
+        for i, (height, names) in enumerate(elements):
+            result.update(zip(names, [x[i] for x in values]))
+
+    # Whole oscillations, one row per point
+    if any(name in outputs for name in oscillation_outputs):
+        zinslag = zins[:,None]+zinslag_AFMarray
+        heights = [0, cantheight] if 2 in geometrybuttons and ('df' in outputs or 'dg' in outputs) else [0]
+        Vs_AFMarray,Es_AFMarray,Qs_AFMarray,F_AFMarray,P_AFMarray = Organization_BuildArrays.AFM_timearrays(None,None,zinslag,Vg[:,None],zins,Na,Nd,epsilon_sem,T,CPD,LD,nb,pb,ni,eta, heights=heights)
+        F_AFMarray, Fcant_AFMarray, P_AFMarray = F_AFMarray[0], F_AFMarray[-1] if len(heights) == 2 else 0, P_AFMarray[0]
+        result['df'], result['dg'] = Physics_ncAFM.dfdg(time_AFMarray,F_AFMarray,Fcant_AFMarray,frequency,springconst,amplitude,Qfactor,tipradius,cantarea,geometrybuttons)
+        result['DP'] = np.max(P_AFMarray, axis=-1)-np.min(P_AFMarray, axis=-1)
+
+    return [result[name] for name in outputs]
+
+# Sweep outputs over the grid spanned by axes
+    # params: slider value of every input (see Sweep_presets), plus geometrybuttons
+    # axes: {name: values}, in slider units; the result has one dimension per axis, in this order
+    # outputs: names from tip_outputs, cant_outputs and oscillation_outputs
+    # Points are grouped by their bulk and AFM values. The bulk state of every material is computed
+    # once (all Fermi levels in one Surface_Efarray solve), and every group is solved in blocks of at
+    # most chunksize elements, one Executor_map task per block.
+    # Returns {'axes': {name: values}, output: array of shape (len(values) for every axis)}.
+def Sweep(params, axes, outputs):
+    names = list(axes)
+    unknown = [name for name in names if name not in bulk_axes+afm_axes+surface_axes]
+    unknown += [name for name in outputs if name not in tip_outputs+cant_outputs+oscillation_outputs]
+    if unknown:
+        raise ValueError('Unknown sweep axes or outputs: %s' % ', '.join(unknown))
+    values = [np.asarray(axes[name], dtype=float) for name in names]
+    shape = tuple(len(x) for x in values)
+    grid = dict(zip(names, [x.ravel() for x in np.meshgrid(*values, indexing='ij')]))
+    size = int(np.prod(shape))
+    def column(name): # value of an input at every point
+        return grid[name] if name in grid else np.full(size, float(params[name]))
+
+    # Bulk state of every distinct material
+    materials, material_index = np.unique(np.stack([column(name) for name in bulk_axes], axis=1), axis=0, return_inverse=True)
+    inputs = [Organization_IntermValues.Surface_inputvalues(0,0,0,*row,2,2)[2:11] for row in materials]
+    Eg,epsilon_sem,WFmet,EAsem,Nd,Na,mn,mp,T = [np.array(x) for x in zip(*inputs)]
+    Ef = Organization_IntermValues.Surface_Efarray(Eg,Nd,Na,mn,mp,T)
+    states = []
+    for values_in, Ef_in in zip(inputs, Ef):
+        NC,NV,Ec,Ev,Ei,Ef_out,no,po,ni,nb,pb,CPD,LD,eta = Organization_IntermValues.Surface_bulkcalculations(*values_in, float(Ef_in))
+        states.append((values_in[5],values_in[4],values_in[1],values_in[8],CPD,LD,nb,pb,ni,eta))
+
+    # Oscillation of every distinct AFM setting
+    settings, setting_index = np.unique(np.stack([column(name) for name in afm_axes], axis=1), axis=0, return_inverse=True)
+    oscillations = []
+    for amplitude,resfreq,lag,timesteps,tipradius,cantheight,cantarea,springconst,Qfactor in settings:
+        amplitude,frequency,lag,timesteps,tipradius,cantheight,cantarea,time_AFMarray,zins_AFMarray,zinslag_AFMarray = Organization_IntermValues.AFM1_inputvalues(amplitude,resfreq,lag,int(timesteps),tipradius,cantheight,cantarea, 0)
+        springconst,Qfactor = Organization_IntermValues.AFM2_inputvalues(springconst,Qfactor)
+        oscillations.append((amplitude,frequency,timesteps,tipradius,cantheight,cantarea,time_AFMarray,zinslag_AFMarray,springconst,Qfactor))
+
+    # Gate bias and insulator thickness of every point, as Surface_inputvalues converts them
+    Vg = column('Vg')*(1-column('alpha'))*Physics_Semiconductors.e #J
+    zins = column('zins')*1e-9 #m
+
+    # Blocks of points sharing a material and an oscillation
+    group = material_index.ravel()*len(settings)+setting_index.ravel()
+    order = np.argsort(group, kind='stable')
+    starts = np.flatnonzero(np.diff(group[order], prepend=-1))
+    tasks = []
+    for start, stop in zip(starts, np.append(starts[1:], size)):
+        material, setting = divmod(int(group[order[start]]), len(settings))
+        elements = oscillations[setting][2]+1 if any(name in outputs for name in oscillation_outputs) else 1
+        step = max(1, chunksize//elements)
+        for first in range(start, stop, step):
+            tasks.append((material, setting, order[first:min(first+step, stop)]))
+
+    # Then parallelize the calculations, one block per job
+    def compute(task):
+        material, setting, points = task
+        return Sweep_points(states[material], oscillations[setting], Vg[points], zins[points], outputs, params['geometrybuttons'])
+    blocks = Organization_Executor.Executor_map(compute, tasks)
+
+    result = {'axes': dict(zip(names, values))}
+    for i, name in enumerate(outputs):
+        array = np.empty(size)
+        for (material, setting, points), block in zip(tasks, blocks):
+            array[points] = block[i]
+        result[name] = array.reshape(shape)
+    return result
+
+# A Sweep result as a table, one row per point and one column per axis and output
+def Sweep_dataframe(result):
+    axes = result['axes']
+    columns = dict(zip(axes, [x.ravel() for x in np.meshgrid(*axes.values(), indexing='ij')]))
+    columns.update((name, array.ravel()) for name, array in result.items() if name != 'axes')
+    return pd.DataFrame(columns)
@@ -8,9 +8,9 @@
 
 import numpy as np
 import pandas as pd
-from scipy.integrate import quad
+import threading
+from collections import OrderedDict
 from scipy.integrate import trapz
-from joblib import Parallel, delayed
 
 import Physics_Semiconductors
 
@@ -26,91 +26,213 @@ epsilon_o = Physics_Semiconductors.epsilon_o
 
 ################################################################################
 ################################################################################
-# Calculate band bending
-def BandBending(T,epsilon_sem,nb,pb,Vs):
-
-    numdatapoints = 101
-
-    def z_sem_eqn(V_variable):
-        f_soln= Physics_Semiconductors.Func_f(T,V_variable,nb,pb) #dimensionless
-        E_soln=Physics_Semiconductors.Func_E(nb,pb,V_variable,epsilon_sem,T,f_soln) #V/m
-        eqn = 1 / (Physics_Semiconductors.e*E_soln) #m/J
-        return eqn
-
-    def compute(V_variable):
-        zsem_soln, error = quad(z_sem_eqn, V_variable, Vs) #m
-        fsem_soln = Physics_Semiconductors.Func_f(T,V_variable,nb,pb) #dimensionless
-        Esem_soln = Physics_Semiconductors.Func_E(nb,pb,V_variable,epsilon_sem,T,fsem_soln) #V/m
-        Qsem_soln = Physics_Semiconductors.Func_Q(epsilon_sem,Esem_soln) #C/m**2
-        Vsem_soln = V_variable #J
-        return [zsem_soln, Vsem_soln, Esem_soln, Qsem_soln]
-
-    if Vs == 0: # flatband case
-        Vsem_soln = 0
-        fsem_soln = Physics_Semiconductors.Func_f(T,0,nb,pb)
-        Esem_soln = Physics_Semiconductors.Func_E(nb,pb,0,epsilon_sem,T,fsem_soln)
-        Qsem_soln = Physics_Semiconductors.Func_Q(epsilon_sem,Esem_soln)
-        z_sem = np.linspace(0, 150, numdatapoints)
-        V_sem = np.repeat(Vsem_soln, numdatapoints)
-        E_sem = np.repeat(Esem_soln, numdatapoints)
-        Q_sem = np.repeat(Qsem_soln, numdatapoints)
-        return [z_sem, V_sem, E_sem, Q_sem]
+# Depth grid for the band bending
+    # Points are placed so that drawing V(z) with straight lines between them is off by at most
+    # tol*|Vs|. On an interval dz that error is dz**2/8*|V''|, and with the reduced depth
+    # zeta = z*sqrt(2)/LD, u'' = d(f**2)/du/2 and dzeta = du/f, so the point density per unit a = |u| is
+    # sqrt(|d(f**2)/du|/(16*tol*as))/f. BandBending_pilot integrates it on a pilot grid t in sqrt(a),
+    # where it stays finite at flatband, for every surface potential s*as (one row each), and
+    # BandBending_grid spaces the points at equal steps of that integral.
+    # Each grid runs from as down to as*1e-4.
+def BandBending_pilot(nn,pn,s,a_s, eta=None, tol=1e-3):
+    a_s = np.asarray(a_s, dtype=float)[:,None]
+    t = np.linspace(np.sqrt(a_s*0.0001), np.sqrt(a_s), 257, axis=1)[...,0]
+    fsq, dfsq, flatband = Physics_Semiconductors.Func_fsq(np.asarray(s)[:,None]*t**2,nn,pn, eta)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        density = np.nan_to_num(2*t*np.sqrt(np.abs(dfsq)/(16*tol*a_s))/np.sqrt(np.maximum(fsq, 0)))
+    points = np.concatenate((np.zeros_like(a_s), np.cumsum((density[:,1:]+density[:,:-1])/2*np.diff(t), axis=1)), axis=1)
+    return t, points
+
+    # numdatapoints points on every row (by default as many as the most demanding row needs)
+def BandBending_grid(t, points, numdatapoints=None):
+    if numdatapoints is None:
+        numdatapoints = max(3, int(np.ceil(np.max(points[:,-1])))+1)
+    # one np.interp for all rows: each row's points scaled to [0,1] and shifted by 2 per row stay increasing overall
+    offset = 2*np.arange(len(t))[:,None]
+    levels = np.linspace(1, 0, numdatapoints)+offset
+    t_grid = np.interp(levels.ravel(), (points/points[:,-1:]+offset).ravel(), t.ravel()).reshape(levels.shape)
+    t_grid[:,0], t_grid[:,-1] = t[:,-1], t[:,0]
+    return t_grid**2 #dimensionless, decreasing from as to as*1e-4 along each row
 
+################################################################################
+################################################################################
+# Calculate band bending
+    # Hudlet (1995) Electrostatic forces between metallic tip and semiconductor surfaces
+    # z(V) = integral_V^Vs dV'/(e*E(V')), which with a = |V|/kT and E from Func_E is
+    # z = LD/sqrt(2) * integral_a^as da'/f(a'), LD and f both normalized to N = max(nb,pb).
+    # f ~ c*a near flatband, so 1/f is split into 1/(c*a), integrated analytically (a log), and
+    # the remainder 1/f-1/(c*a), which is smooth and integrated by Gauss-Legendre on every interval
+    # of the grid a (one row per surface potential). A cumulative sum then gives the reduced depth
+    # zeta = z*sqrt(2)/LD at all points in one pass. Returns zeta and f on the grid.
+    # With eta (see Physics_Semiconductors.Func_f) the carriers follow Fermi-Dirac statistics.
+    # Each row's intervals are subdivided into as many panels as its widest one needs, and rows needing
+    # the same number are built together, in blocks of at most profile_chunksize nodes.
+nodes, weights = np.polynomial.legendre.leggauss(8)
+profile_chunksize = 2**20
+
+def BandBending_profile(nn,pn,s,a, eta=None):
+    s, a = np.asarray(s), np.asarray(a)
+    panels = np.maximum(1, np.ceil(np.max(a[:,:-1]-a[:,1:], axis=1))).astype(int)
+    zeta, f = np.empty(a.shape), np.empty(a.shape)
+    for count in np.unique(panels):
+        rows = np.flatnonzero(panels == count)
+        step = max(1, profile_chunksize//((a.shape[1]-1)*count*len(nodes)))
+        for start in range(0, len(rows), step):
+            block = rows[start:start+step]
+            zeta[block], f[block] = BandBending_panels(nn,pn,s[block],a[block],count, eta)
+    return zeta, f
+
+def BandBending_panels(nn,pn,s,a,panels, eta=None):
+    s = s[:,None]
+
+    # Gauss-Legendre nodes on every interval [a[k+1], a[k]], subdivided into panels
+    edges = np.linspace(a[:,:-1], a[:,1:], panels+1, axis=-1) # (rows, numdatapoints-1, panels+1)
+    left, right = edges[...,:-1], edges[...,1:]
+    a_nodes = (left+right)[...,None]/2+(left-right)[...,None]/2*nodes # (rows, intervals, panels, nodes)
+
+    # f at the nodes and at the grid points, in one evaluation
+    u = np.concatenate(((s[...,None,None]*a_nodes).ravel(), (s*a).ravel()))
+    fsq, dfsq, flatband = Physics_Semiconductors.Func_fsq(u,nn,pn, eta)
+    f = np.sqrt(np.maximum(fsq, 0))
+    c = np.sqrt(flatband)
+    f_nodes, f_grid = f[:a_nodes.size].reshape(a_nodes.shape), f[a_nodes.size:].reshape(a.shape)
+
+    # integral over each interval of the smooth remainder, then cumulatively from Vs
+    remainder = np.sum(np.sum(weights*(1/f_nodes-1/(c*a_nodes)), axis=-1)*(left-right)/2, axis=-1)
+    integral = np.concatenate((np.zeros((len(a), 1)), np.cumsum(remainder, axis=1)), axis=1)
+    zeta = np.log(a[:,:1]/a)/c+integral #dimensionless
+    return zeta, f_grid
+
+# Cache of band bending profiles in reduced units
+    # Profiles only depend on the bulk (nn, pn, eta), tol and the surface potential us, so they are kept,
+    # least recently used first out, keyed on those with us quantized to steps of tol/10 in ln|us|.
+    # A profile is then reused for every |us| within 0.005% (for tol = 1e-3) and rescaled to the exact one,
+    # an error well inside tol. Each entry holds the pilot (and so the number of points the row needs)
+    # and the profiles (a, zeta, f) already built on it, by number of points.
+profile_cache = OrderedDict()
+profile_cache_size = 1024
+profile_cache_lock = threading.Lock()
+
+def BandBending_cached(nn,pn,s,a_s, eta=None, tol=1e-3, numdatapoints=None):
+    step = tol/10
+    index = np.round(np.log(a_s)/step).astype(int)
+    keys = [(nn, pn, eta, tol, int(sign), int(i)) for sign, i in zip(s, index)]
+    with profile_cache_lock:
+        entries = {key: profile_cache.get(key) for key in keys}
+        for key in entries:
+            if entries[key] is not None:
+                profile_cache.move_to_end(key)
+
+    # pilots for the rows not seen before, all at once
+    new = [key for key, entry in entries.items() if entry is None]
+    if new:
+        t, points = BandBending_pilot(nn,pn,[key[4] for key in new],[np.exp(key[5]*step) for key in new], eta, tol)
+        for i, key in enumerate(new):
+            entries[key] = {'t': t[i], 'points': points[i], 'count': max(3, int(np.ceil(points[i,-1])))+1}
+    if numdatapoints is None:
+        numdatapoints = max(entries[key]['count'] for key in keys)
+
+    # profiles for the rows not yet built on numdatapoints points, all at once
+    build = [key for key, entry in entries.items() if numdatapoints not in entry]
+    if build:
+        a = BandBending_grid(np.array([entries[key]['t'] for key in build]), np.array([entries[key]['points'] for key in build]), numdatapoints)
+        zeta, f = BandBending_profile(nn,pn,[key[4] for key in build],a, eta)
+        for i, key in enumerate(build):
+            entries[key][numdatapoints] = (a[i], zeta[i], f[i])
+    with profile_cache_lock:
+        for key, entry in entries.items():
+            profile_cache[key] = entry
+        while len(profile_cache) > profile_cache_size:
+            profile_cache.popitem(last=False)
+
+    # every row, rescaled from its quantized us to the exact one
+    a, zeta, f = [np.array([entries[key][numdatapoints][j] for key in keys]) for j in range(3)]
+    a = a*(a_s/np.exp(index*step))[:,None]
+    return a, zeta, f
+
+def BandBending(T,epsilon_sem,nb,pb,Vs, eta=None, tol=1e-3, numdatapoints=None):
+    zsem, Vsem, Esem, Qsem = BandBending_batch(T,epsilon_sem,nb,pb,np.ravel(Vs)[:1], eta, tol, numdatapoints)
+    shape = (-1,)+np.shape(Vs)
+    return [zsem[0], Vsem[0].reshape(shape), Esem[0].reshape(shape), Qsem[0].reshape(shape)]
+
+# Band bending for a whole array of Vs at once (e.g. every timestep of an AFM oscillation)
+    # Returns 2D arrays z_sem, V_sem, E_sem, Q_sem, one row per Vs, all on grids of the same length.
+    # Rows come from the profile cache where possible (BandBending_cached); the rest are built together.
+def BandBending_batch(T,epsilon_sem,nb,pb,Vs, eta=None, tol=1e-3, numdatapoints=None):
+
+    Vs = np.ravel(Vs)
+    bent = Vs != 0
+    N = np.maximum(nb,pb) # 1/m**3
+    LD = Physics_Semiconductors.Func_LD(epsilon_sem,N,T) # m
+    if eta is not None:
+        eta = tuple(float(x) for x in eta)
+    if np.any(bent):
+        s = np.sign(Vs[bent])
+        a, zeta, f = BandBending_cached(float(nb/N),float(pb/N),s,np.abs(Vs[bent])/(kB*T), eta, tol, numdatapoints)
+        numdatapoints = a.shape[1]
     else:
-        V_sem = np.linspace(Vs, Vs * 0.0001, numdatapoints)
-        result = Parallel(n_jobs=-1)(
-            delayed(compute)(V_variable) for V_variable in V_sem
-        )
-        return [
-            np.asarray([zsem_soln for zsem_soln,Vsem_soln,Esem_soln,Qsem_soln in result]),
-            np.asarray([Vsem_soln for zsem_soln,Vsem_soln,Esem_soln,Qsem_soln in result]),
-            np.asarray([Esem_soln for zsem_soln,Vsem_soln,Esem_soln,Qsem_soln in result]),
-            np.asarray([Qsem_soln for zsem_soln,Vsem_soln,Esem_soln,Qsem_soln in result]),
-        ]
+        numdatapoints = numdatapoints or 3
+
+    # flatband case, and the starting point for the rest
+    z_sem = np.tile(np.linspace(0, 150, numdatapoints), (len(Vs), 1))
+    V_sem = np.zeros((len(Vs), numdatapoints))
+    E_sem = np.zeros((len(Vs), numdatapoints))
+    if np.any(bent):
+        z_sem[bent] = LD/np.sqrt(2)*zeta #m
+        V_sem[bent] = s[:,None]*a*kB*T #J
+        E_sem[bent] = s[:,None]*np.sqrt(2)*kB*T/(LD*e)*f #V/m (Func_E at reference N)
+    Q_sem = Physics_Semiconductors.Func_Q(epsilon_sem,E_sem) #C/m**2
+    return [z_sem, V_sem, E_sem, Q_sem]
 
 
 
 # Create arrays needed to draw the band diagram
+    # zins (with Vs) may also be an array, e.g. one value per AFM timestep, with the profiles
+    # zsem, Vsem, Esem, Qsem from BandBending_batch; every output then has one row per zins.
 def BandDiagram(Vg,zins,T,Nd,Na,WFmet,EAsem,epsilon_sem, ni,nb,pb,Vs,Ec,Ev,Ef,Ei,Eg,CPD, zsem,Vsem,Esem,Qsem):
 
-    
+    zins = np.asarray(zins, dtype=float)
+    Vs = np.reshape(Vs, zins.shape)
+    zsem, Vsem, Esem, Qsem = [np.reshape(x, zins.shape+(-1,)) for x in (zsem, Vsem, Esem, Qsem)]
+    def points(*values): # one row of points per zins
+        return np.stack([np.broadcast_to(value, zins.shape) for value in values], axis=-1)
+
     # Insulator (gap)
-    zgap = np.array([0, 0, -zins, -zins, 0])
-    Eins = -Qsem[1]/(Physics_Semiconductors.epsilon_o)
-    if Vs<0:
-        offbot = Ef-EAsem #J #Arbitrary, just to draw as a generic wide-gap insulator
-    else:
-        offbot = -Vg-WFmet
+    zgap = points(0, 0, -zins, -zins, 0)
+    Eins = -Qsem[...,1]/(Physics_Semiconductors.epsilon_o)
+    offbot = np.where(Vs<0,
+        Ef-EAsem, #J #Arbitrary, just to draw as a generic wide-gap insulator
+        -Vg-WFmet)
 
-    Vgap = np.array([offbot, Ec-Vs+EAsem, -Vg+WFmet, offbot, offbot]) #J #Definitions of WFmet and EAsem
+    Vgap = points(offbot, Ec-Vs+EAsem, -Vg+WFmet, offbot, offbot) #J #Definitions of WFmet and EAsem
 
     # Metal (gate)
     offgate = 20e-9 #m #Arbitrary spatial drawing of the gate (z)
-    zmet = np.array([-zins-offgate, -zins])
-    Vmet = np.array([-Vg, -Vg])
-    Qmet = -1*Qsem[1]
+    zmet = points(-zins-offgate, -zins)
+    Vmet = points(-Vg, -Vg)
+    Qmet = -1*Qsem[...,1]
     # Vacuum
-    zvac = np.hstack((zmet,zsem))
-    Vvac = np.hstack((Vmet+WFmet, Ec-Vsem+EAsem))
+    zvac = np.concatenate((zmet,zsem), axis=-1)
+    Vvac = np.concatenate((Vmet+WFmet, Ec-Vsem+EAsem), axis=-1)
 
     #######################################################
 
     # Combined z
     zsemarray = zsem
-    zinsarray = np.array([-zins, 0])
-    zmetarray = np.array([-zins-offgate, -zins,-zins])
-    zarray = np.hstack((zmetarray,zinsarray,zsemarray))
+    zinsarray = points(-zins, 0)
+    zmetarray = points(-zins-offgate, -zins,-zins)
+    zarray = np.concatenate((zmetarray,zinsarray,zsemarray), axis=-1)
 
     # Combined E
     Esemarray = Esem
-    Einsarray = np.array([Eins, Eins])
-    Emetarray = np.array([0, 0, 0])
-    Earray = np.hstack((Emetarray,Einsarray,Esemarray))
+    Einsarray = points(Eins, Eins)
+    Emetarray = points(0, 0, 0)
+    Earray = np.concatenate((Emetarray,Einsarray,Esemarray), axis=-1)
 
     # Combined Q
     Qsemarray = Qsem
-    Qinsarray = np.array([0, 0])
-    Qmetarray = np.array([0, 0, Qmet])
-    Qarray = np.hstack((Qmetarray,Qinsarray,Qsemarray))
+    Qinsarray = points(0, 0)
+    Qmetarray = points(0, 0, Qmet)
+    Qarray = np.concatenate((Qmetarray,Qinsarray,Qsemarray), axis=-1)
 
-    return zgap,Vgap, zvac,Vvac, zmet,Vmet, zarray,Earray,Qarray
\ No newline at end of file
+    return zgap,Vgap, zvac,Vvac, zmet,Vmet, zarray,Earray,Qarray
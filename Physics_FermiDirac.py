@@ -0,0 +1,110 @@
+################################################################################
+################################################################################
+# This script evaluates the Fermi-Dirac integrals needed for degenerate carrier
+# statistics, e.g. no = NC*F_1/2((Ef-Ec)/kT), on whole arrays at once.
+################################################################################
+################################################################################
+
+import numpy as np
+from functools import lru_cache
+from scipy.special import gammaln, gamma, zeta
+from scipy.interpolate import CubicSpline
+
+################################################################################
+################################################################################
+# Fermi-Dirac integrals
+
+# Normalized Fermi-Dirac integral of order j (j = -1/2, 1/2, 3/2)
+    # Blakemore Semiconductor Statistics (pg 346)
+    # F_j(eta) = 1/Gamma(j+1) * integral_0^inf x^j/(1+exp(x-eta)) dx, so F_j -> exp(eta) in the
+    # nondegenerate limit and dF_j/deta = F_(j-1).
+    # Everything is done with ln(F_j), which neither underflows nor overflows:
+    # eta < eta_lo:  first two terms of the series sum (-1)^(k+1) exp(k*eta)/k^(j+1) (exact to double precision)
+    # eta > eta_hi:  Sommerfeld expansion (for half-integer j it has no exponentially small remainder)
+    # otherwise:     cubic spline through a table computed once, on first use, by Gauss-Legendre quadrature
+eta_lo = -40
+eta_hi = 60
+nodes, weights = np.polynomial.legendre.leggauss(12) # for the band bending integrals below
+
+@lru_cache(maxsize=None)
+def FD_table(j):
+    eta = np.arange(eta_lo-0.5, eta_hi+0.5, 0.02)
+    # x = t**2 removes the x**j singularity at x = 0; the range is split around the Fermi edge
+    table_nodes, table_weights = np.polynomial.legendre.leggauss(64)
+    edges = np.sqrt(np.array([0*eta, np.maximum(eta-8,0), np.maximum(eta,0)+8, np.maximum(eta,0)+60]))
+    F = 0
+    for a, b in zip(edges[:-1], edges[1:]):
+        t = (a+b)[:,None]/2+(b-a)[:,None]/2*table_nodes
+        with np.errstate(over='ignore'):
+            integrand = 2*t**(2*j+1)/(1+np.exp(t**2-eta[:,None]))
+        F = F+(b-a)/2*np.sum(table_weights*integrand, axis=1)
+    spline = CubicSpline(eta, np.log(F)-gammaln(j+1))
+    # Sommerfeld coefficients of eta^(-2k), k = 1..4
+    k = np.arange(1, 5)
+    sommerfeld = 2*(1-2.0**(1-2*k))*zeta(2*k)*gamma(j+2)/gamma(j+2-2*k)
+    return spline.x, spline.c, sommerfeld
+
+def Func_lnFD(j, eta): # dimensionless
+    eta = np.asarray(eta, dtype=float)
+    x, c, sommerfeld = FD_table(j)
+    # the table is uniform, so the interval is found by arithmetic instead of a search
+    mid = np.clip(eta, eta_lo, eta_hi)
+    i = ((mid-x[0])*(1/(x[1]-x[0]))).astype(int)
+    dx = mid-x.take(i)
+    lnF = ((c[0].take(i)*dx+c[1].take(i))*dx+c[2].take(i))*dx+c[3].take(i)
+    if np.any(eta < eta_lo):
+        low = np.minimum(eta, eta_lo)
+        lnF = np.where(eta < eta_lo, low+np.log1p(-np.exp(low)/2**(j+1)), lnF)
+    if np.any(eta > eta_hi):
+        high = np.maximum(eta, eta_hi)
+        y = 1/(high*high)
+        lnF = np.where(eta > eta_hi, (j+1)*np.log(high)-gammaln(j+2)+np.log1p((((sommerfeld[3]*y+sommerfeld[2])*y+sommerfeld[1])*y+sommerfeld[0])*y), lnF)
+    return lnF
+
+def Func_FD(j, eta): # dimensionless
+    return np.exp(Func_lnFD(j, eta))
+
+# Inverse of F_1/2: the eta at which F_1/2(eta) = y
+    # Nilsson (1973) Phys. Stat. Sol. (a) 19, K75; within about 1% everywhere, so it is used
+    # as the starting point of a solve rather than as a result.
+def Func_FD_inverse(y): # dimensionless
+    y = np.asarray(y, dtype=float)
+    nu = (3*np.sqrt(np.pi)*y/4)**(2/3)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        lnterm = np.where(y == 1, -1/2, np.log(y)/(1-y**2))
+    return lnterm+nu-nu/(1+(0.24+1.08*nu)**2)
+
+# Band bending integrals for the surface charge
+    # With eta the bulk reduced Fermi level of a band, n its normalized bulk density and u the
+    # reduced potential at which its carriers sit (eta -> eta+u), returns
+    # D  = n*(F_3/2(eta+u)-F_3/2(eta)-u*F_1/2(eta))/F_1/2(eta)
+    # dD = n*(F_1/2(eta+u)-F_1/2(eta))/F_1/2(eta)          (= dD/du)
+    # which reduce to n*(expm1(u)-u) and n*expm1(u) in the nondegenerate limit, and are used as
+    # such wherever eta and eta+u are both below eta_lo. n is applied in logs, so that a band
+    # whose density underflows contributes 0 rather than 0*inf.
+    # For |u| <= 1 both are integrated from F_-1/2 instead, since the differences cancel there.
+def Func_FD_bandbending(eta, u, n=1):
+    # eta is usually a single bulk value, so its own integrals are evaluated before broadcasting
+    lnF12, lnF32 = Func_lnFD(1/2, eta), Func_lnFD(3/2, eta)
+    eta, u, n, lnF12, lnF32 = np.broadcast_arrays(*[np.asarray(x, dtype=float) for x in (eta, u, n, lnF12, lnF32)])
+    shape = eta.shape
+    eta, u, n, lnF12, lnF32 = eta.ravel(), u.ravel(), n.ravel(), lnF12.ravel(), lnF32.ravel()
+    with np.errstate(over='ignore', invalid='ignore', divide='ignore'):
+        D = np.where(n > 0, n*(np.expm1(u)-u), 0)
+        dD = np.where(n > 0, n*np.expm1(u), 0)
+        degenerate = (eta >= eta_lo) | (eta+u >= eta_lo)
+        small = degenerate & (np.abs(u) <= 1)
+        large = degenerate & ~small
+        if np.any(large):
+            x, us, ln_n, ln_F = eta[large], u[large], np.log(n[large]), lnF12[large]
+            D[large] = np.exp(ln_n+Func_lnFD(3/2, x+us)-ln_F)-n[large]*(np.exp(lnF32[large]-ln_F)+us)
+            dD[large] = np.exp(ln_n+Func_lnFD(1/2, x+us)-ln_F)-n[large]
+    if np.any(small):
+        # F_3/2(eta+u)-F_3/2(eta)-u*F_1/2(eta) = integral_0^u (u-s)*F_-1/2(eta+s) ds
+        # F_1/2(eta+u)-F_1/2(eta) = integral_0^u F_-1/2(eta+s) ds
+        x, us = eta[small][:,None], u[small][:,None]
+        s = us/2*(1+nodes)
+        F = np.exp(Func_lnFD(-1/2, x+s)-lnF12[small][:,None])
+        D[small] = n[small]*np.sum(weights*(us-s)*F, axis=1)*u[small]/2
+        dD[small] = n[small]*np.sum(weights*F, axis=1)*u[small]/2
+    return D.reshape(shape), dD.reshape(shape)
@@ -0,0 +1,188 @@
+################################################################################
+################################################################################
+# This script solves Poisson's equation in the semiconductor on a 1D depth grid,
+# for any doping profile Nd(z), Na(z) (e.g. a buried delta-doped layer). For
+# uniform doping it gives the same Vs and band bending as Func_Vs and
+# BandBending, which integrate the closed form instead.
+################################################################################
+################################################################################
+
+import numpy as np
+
+import Physics_Semiconductors
+import Physics_FermiDirac
+
+################################################################################
+################################################################################
+# physical constants
+
+kB = Physics_Semiconductors.kB
+e = Physics_Semiconductors.e
+epsilon_o = Physics_Semiconductors.epsilon_o
+
+################################################################################
+################################################################################
+# Tridiagonal solve
+
+# Thomas algorithm for many tridiagonal systems at once
+    # Row i reads lower[i]*x[i-1] + diag[i]*x[i] + upper[i]*x[i+1] = rhs[i] (lower[0] and upper[-1]
+    # are ignored). The first axis runs along the system, and any further axes are independent
+    # systems that are all eliminated together.
+def Func_thomas(lower, diag, upper, rhs):
+    n = len(diag)
+    c = np.empty(np.broadcast(diag, rhs).shape)
+    d = np.empty(c.shape)
+    c[0] = upper[0]/diag[0]
+    d[0] = rhs[0]/diag[0]
+    for i in range(1, n):
+        m = diag[i]-lower[i]*c[i-1]
+        c[i] = upper[i]/m
+        d[i] = (rhs[i]-lower[i]*d[i-1])/m
+    for i in range(n-2, -1, -1):
+        d[i] -= c[i]*d[i+1]
+    return d
+
+################################################################################
+################################################################################
+# Poisson's equation
+
+# Depth grid in Debye lengths
+    # Spacing grows geometrically (by growth per point) from the surface, so every depth is resolved
+    # to a fixed fraction of itself, down to the accumulation/inversion screening length ~exp(-|us|/2)
+    # at the surface, up to hmax. It reaches well past the depletion layer, sqrt(2*|us|) LD.
+    # screening is the flatband screening length in LD, 1 for Boltzmann statistics and longer for
+    # degenerate carriers (Fermi-Dirac statistics), and stretches the far grid to match.
+def Poisson_grid(us_max, screening=1, growth=1.05, hmax=0.1):
+    h0 = 0.05*np.exp(-min(abs(us_max), 40)/2)
+    depth = (12+2*np.sqrt(2*abs(us_max)))*screening
+    hmax = hmax*screening
+    h = h0*growth**np.arange(int(np.log(hmax/h0)/np.log(growth))+1)
+    x = np.concatenate(([0], np.cumsum(h)))
+    return np.concatenate((x, np.arange(x[-1]+hmax, max(depth, x[-1]+hmax)+hmax, hmax)))
+
+# Doping profile on the grid: a function of depth z (m), or a constant
+def Poisson_doping(N_z, z): # 1/m**3
+    if callable(N_z):
+        return np.asarray(N_z(z), dtype=float)*np.ones_like(z)
+    return np.full_like(z, N_z, dtype=float)
+
+# Electron and hole densities at reduced potential u, normalized as nn and pn, and their slopes dn/du, -dp/du
+    # Boltzmann statistics n = nn*exp(u), p = pn*exp(-u), or with eta (see Physics_Semiconductors.Func_f)
+    # Fermi-Dirac statistics n = nn*F_1/2(eta_n+u)/F_1/2(eta_n), p = pn*F_1/2(eta_p-u)/F_1/2(eta_p),
+    # whose slopes take F_-1/2 in place of F_1/2. Exponents are capped so exp stays finite.
+def Poisson_carriers(u,nn,pn, eta=None):
+    if eta is None:
+        n, p = nn*np.exp(np.minimum(u, 700)), pn*np.exp(np.minimum(-u, 700))
+        return n, p, n, p
+    lnF_n, lnF_p = Physics_FermiDirac.Func_lnFD(1/2,eta[0]), Physics_FermiDirac.Func_lnFD(1/2,eta[1])
+    n = nn*np.exp(np.minimum(Physics_FermiDirac.Func_lnFD(1/2,eta[0]+u)-lnF_n, 700))
+    p = pn*np.exp(np.minimum(Physics_FermiDirac.Func_lnFD(1/2,eta[1]-u)-lnF_p, 700))
+    dn = nn*np.exp(np.minimum(Physics_FermiDirac.Func_lnFD(-1/2,eta[0]+u)-lnF_n, 700))
+    dp = pn*np.exp(np.minimum(Physics_FermiDirac.Func_lnFD(-1/2,eta[1]-u)-lnF_p, 700))
+    return n, p, dn, dp
+
+# Starting point for the Newton iteration: the uniform-doping profile
+    # du/dx = -sign(u)*sqrt(2)*f(u) (see Physics_BandDiagram.BandBending) stepped along the grid
+    # from the uniform-doping us, by Heun's method.
+def Poisson_guess(us, x, nn, pn, eta=None):
+    def slope(u):
+        fsq, dfsq, flatband = Physics_Semiconductors.Func_fsq(u,nn,pn, eta)
+        return -np.sign(u)*np.sqrt(2*np.maximum(fsq, 0))
+    u = np.empty((len(x)-1,)+np.shape(us))
+    u[0] = us
+    for i in range(len(x)-2):
+        h = x[i+1]-x[i]
+        k = slope(u[i])
+        u[i+1] = u[i]+h/2*(k+slope(u[i]+h*k))
+    return u
+
+# Surface potential and band bending for a doping profile Nd(z), Na(z)
+    # Sze Physics of Semiconductor Devices (pg. 199)
+    # With u = V/kT and depth x = z/LD (both at N = max(nb,pb), as in Func_Vs_reducedparams),
+    # u'' = -(p(u) - n(u) + (Nd(z)-Na(z))/N), with u = 0 in the bulk and, at the surface,
+    # the insulator condition u(0) - epsilon_sem*zins/LD*u'(0) = ug (Func_Vs's equation).
+    # n(u), p(u) follow Boltzmann statistics, or with eta Fermi-Dirac statistics (Poisson_carriers).
+    # nb, pb are the bulk densities, so Nd(z)-Na(z) should tend to nb-pb deep in the bulk, and with
+    # Nd_z = nb, Na_z = pb (the default) the doping is uniform.
+    # The equation is discretized by finite volumes on the grid z (m, from Poisson_grid by default)
+    # and solved by Newton, each step a tridiagonal (Func_thomas) solve. Steps are damped
+    # logarithmically (du -> sign(du)*log(1+|du|)), which keeps exp(u) in range far from the
+    # solution and leaves the quadratic convergence near it untouched. The iteration starts
+    # from the uniform-doping solution (Func_Vs_batch, Poisson_guess).
+    # Vg and/or zins may be arrays, which are all solved at once on one grid.
+    # Returns Vs, Qs (shaped as Vg and zins) and the band profile [z_sem, V_sem, E_sem, Q_sem] as
+    # Physics_BandDiagram.BandBending_batch does, one row per point of the flattened Vg, zins.
+    # With full_output=True, also returns Newton diagnostics as in Func_newton.
+def Func_Vs_Poisson(Vg,zins,CPD,epsilon_sem,T,nb,pb, Nd_z=None, Na_z=None, z=None, xtol=1e-10, maxiter=100, full_output=False, eta=None):
+    Vg, zins = np.broadcast_arrays(np.asarray(Vg,dtype=float), np.asarray(zins,dtype=float))
+    if Nd_z is None and Na_z is None:
+        Nd_z, Na_z = nb, pb
+    ug, lam, nn, pn = Physics_Semiconductors.Func_Vs_reducedparams(Vg,zins,CPD,epsilon_sem,T,nb,pb)
+    N = np.maximum(nb,pb) # 1/m**3
+    LD = Physics_Semiconductors.Func_LD(epsilon_sem,N,T) # m
+    b = lam/np.sqrt(2) # epsilon_sem*zins/LD
+
+    us = Physics_Semiconductors.Func_Vs_batch(Vg,zins,CPD,None,None,epsilon_sem,T,nb,pb,None, eta=eta)/(kB*T) # uniform doping
+    if z is None:
+        flatband = Physics_Semiconductors.Func_fsq(0,nn,pn, eta)[2]
+        z = Poisson_grid(np.max(np.abs(us))+1, max(1, 1/np.sqrt(2*flatband)))*LD
+    x = z/LD
+    h = np.diff(x)
+    extra = (1,)*np.ndim(ug) # the grid axis comes first, then the axes of Vg/zins
+    doping = ((Poisson_doping(Nd_z, z)-Poisson_doping(Na_z, z))/N)[:-1].reshape((-1,)+extra)
+    width = (np.concatenate(([0], h[:-1]))+h).reshape((-1,)+extra)/2 # finite volume of each unknown
+    h = h.reshape((-1,)+extra)
+
+    # unknowns at every grid point but the last, where u = 0
+    u = Poisson_guess(us, x, nn, pn, eta)
+    # couplings to the neighbouring unknowns; the surface point is coupled to the gate through the insulator
+    lower = np.concatenate(([0], 1/h[:-1].ravel())).reshape((-1,)+extra)
+    upper = np.concatenate((1/h[:-1].ravel(), [0])).reshape((-1,)+extra)
+    left = np.concatenate((np.broadcast_to(1/b, (1,)+np.shape(ug)), np.broadcast_to(1/h[:-1], (len(h)-1,)+np.shape(ug))))
+
+    history = [] if Physics_Semiconductors.trace_enabled else None
+    converged = np.zeros(np.shape(ug), dtype=bool)
+    for niter in range(1, maxiter+1):
+        n, p, dn, dp = Poisson_carriers(u,nn,pn, eta)
+        flux = np.diff(np.concatenate((u, np.zeros((1,)+np.shape(ug)))), axis=0)/h
+        residual = flux-np.concatenate(((u[:1]-ug)/b, flux[:-1]))+width*(p-n+doping)
+        diag = -1/h-left-width*(dp+dn)
+        du = Func_thomas(lower, diag, upper, -residual)
+        if history is not None:
+            history.append(float(np.max(np.abs(residual))))
+        converged = np.max(np.abs(du), axis=0) < xtol
+        u = u+np.sign(du)*np.log1p(np.abs(du))
+        if np.all(converged):
+            break
+    infodict = {'nfev': niter, 'niter': niter, 'converged': converged, 'fvec': np.max(np.abs(residual), axis=0)}
+    if history is not None:
+        infodict['history'] = history
+    Physics_Semiconductors.Func_trace_record('Func_Vs_Poisson', infodict)
+
+    # surface values, and the profile with one row per point and depth along each row
+    Vs = u[0]*kB*T #J
+    Qs = -Physics_Semiconductors.Func_Cins(zins)*(Vg-CPD-Vs)/e #C/m**2, as in Func_Vs's equation
+    V_sem = np.moveaxis(np.concatenate((u, np.zeros((1,)+np.shape(ug)))), 0, -1).reshape(-1, len(z))*kB*T #J
+    E_sem = -np.gradient(V_sem, z, axis=1)/e #V/m
+    E_sem[:,0] = -np.ravel(Qs)/(epsilon_sem*epsilon_o)
+    Q_sem = Physics_Semiconductors.Func_Q(epsilon_sem,E_sem) #C/m**2
+    z_sem = np.tile(z, (len(V_sem), 1)) #m
+    if full_output:
+        return Vs, Qs, [z_sem, V_sem, E_sem, Q_sem], infodict
+    return Vs, Qs, [z_sem, V_sem, E_sem, Q_sem]
+
+# Surface potential solver for the builders, for a doping profile Nd_z, Na_z (uniform by default)
+    # Has the signature of the Physics_Semiconductors.Vs_solvers (guess is not needed, since Func_Vs_Poisson
+    # starts from the uniform-doping solution). Its BandBending gives the band profile at the same points,
+    # which the builders (Organization_BuildArrays.Surface_rules) then use in place of
+    # Physics_BandDiagram.BandBending_batch. Pass the solver itself as a builder's solver, e.g.
+    # Surface_biasarrays(..., solver=Poisson_solver(Nd_z)); the uniform one is Vs_solvers['poisson'].
+def Poisson_solver(Nd_z=None, Na_z=None, z=None):
+    def solver(Vg,zins,CPD,Na,Nd,epsilon_sem,T,nb,pb,ni, guess=None, eta=None):
+        return Func_Vs_Poisson(Vg,zins,CPD,epsilon_sem,T,nb,pb, Nd_z, Na_z, z, eta=eta)[0]
+    def bandbending(Vg,zins,CPD,epsilon_sem,T,nb,pb, eta=None):
+        return Func_Vs_Poisson(Vg,zins,CPD,epsilon_sem,T,nb,pb, Nd_z, Na_z, z, eta=eta)[2]
+    solver.BandBending = bandbending
+    return solver
+
+Physics_Semiconductors.Vs_solvers['poisson'] = Poisson_solver()
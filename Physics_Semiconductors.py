@@ -6,8 +6,11 @@
 
 import numpy as np
 import scipy.constants as sp
-from scipy.optimize import fsolve
-from icecream import ic
+from scipy.interpolate import PchipInterpolator
+from scipy.special import expit
+from collections import deque
+
+import Physics_FermiDirac
 
 ################################################################################
 ################################################################################
@@ -20,6 +23,86 @@ e = sp.e #C
 epsilon_o = sp.value('vacuum electric permittivity') #C/(V*m)
 
 
+################################################################################
+################################################################################
+# solver diagnostics
+
+# Tracing of solver convergence, off by default
+    # When disabled, the solvers only test the trace_enabled flag once per iteration and once
+    # per solve. When enabled, every solve appends a record (solver, number of points, nfev,
+    # niter, how many points converged, and the largest |residual| after each iteration) to
+    # trace_buffer, which keeps the most recent records in memory instead of printing them.
+trace_enabled = False
+trace_buffer = deque(maxlen=10000)
+
+def Func_trace_enable(enabled=True):
+    global trace_enabled
+    trace_enabled = enabled
+    trace_buffer.clear()
+
+def Func_trace_record(solver, infodict):
+    if trace_enabled:
+        trace_buffer.append({'solver': solver, 'points': np.size(infodict['converged']),
+                             'nfev': infodict['nfev'], 'niter': infodict['niter'],
+                             'converged': int(np.sum(infodict['converged'])),
+                             'residuals': infodict.get('history', [])})
+
+# Empty the trace buffer and return its records, oldest first
+def Func_trace_dump():
+    records = list(trace_buffer)
+    trace_buffer.clear()
+    return records
+
+
+################################################################################
+################################################################################
+# solver core
+
+# Safeguarded Newton iteration on whole arrays at once
+    # Meant for residuals written in reduced (dimensionless) units, e.g. u = V/kT.
+    # residual(x) returns the residual and its analytic derivative. lo and hi must bracket
+    # the root (the residual changes sign between them), and the bracket shrinks with every
+    # step. Any Newton step that would leave it, is not finite, or is no smaller than the step
+    # two iterations before (the sign of a Newton cycle), is replaced by bisection, so every
+    # point converges.
+    # Returns the root and a dict of convergence diagnostics (named as in fsolve's infodict):
+    # nfev (residual evaluations), niter, converged (per point), fvec (residuals at the last evaluation),
+    # and, while tracing is enabled, history (largest |residual| at each iteration)
+def Func_newton(residual, x0, lo, hi, xtol=1e-12, maxiter=100):
+    x, lo, hi = np.broadcast_arrays(np.asarray(x0,dtype=float), np.asarray(lo,dtype=float), np.asarray(hi,dtype=float))
+    x, lo, hi = np.array(x), np.minimum(lo,hi), np.maximum(lo,hi)
+    x = np.where((x > lo) & (x < hi), x, (lo+hi)/2)
+    r_lo = residual(lo)[0]
+    nfev = 1
+    fvec = r_lo
+    history = []
+    steps = [np.inf, np.inf] # sizes of the last two steps
+    done = (hi-lo) <= xtol*np.maximum(1,np.abs(x))
+    for iteration in range(maxiter):
+        if np.all(done):
+            break
+        with np.errstate(over='ignore', invalid='ignore', divide='ignore'):
+            r, drdx = residual(x)
+            nfev += 1
+            # shrink the bracket around the root, then take a Newton step inside it
+            left = np.sign(r) == np.sign(r_lo)
+            lo = np.where(done | ~left, lo, x)
+            hi = np.where(done | left, hi, x)
+            dx = np.where(r == 0, 0, r/drdx)
+            fvec = np.where(done, fvec, r)
+            if trace_enabled:
+                history.append(float(np.nanmax(np.abs(np.where(done, 0, r)), initial=0)))
+        converged = np.abs(dx) <= xtol*np.maximum(1,np.abs(x))
+        bisect = ~converged & (~np.isfinite(dx) | (x-dx <= lo) | (x-dx >= hi) | (np.abs(dx) > 0.9*steps[0]))
+        x_new = np.where(done, x, np.where(bisect, (lo+hi)/2, x-dx))
+        steps = [steps[1], np.abs(x_new-x)]
+        x = x_new
+        done = done | converged | ((hi-lo) <= xtol*np.maximum(1,np.abs(x)))
+    infodict = {'nfev': nfev, 'niter': nfev-1, 'converged': done, 'fvec': fvec}
+    if trace_enabled:
+        infodict['history'] = history
+    return x, infodict
+
 ################################################################################
 ################################################################################
 # solid state and extrinsic semiconductor definitions
@@ -28,27 +111,42 @@ epsilon_o = sp.value('vacuum electric permittivity') #C/(V*m)
     # Pierret Semiconductor Fundamentals, Vol 1, Ed 2 (pg 38)
     # Neamen Semiconductor Physics & Devices, Ed 2 (pg 71)
     # Jonscher Solid Semiconductors (pg 12-13)
-def Func_fcfv(E,Ef,T): # dimensionless
-    fc = np.reciprocal(np.exp((E-Ef)/(kB*T))+1)
-    fv = 1-np.reciprocal(np.exp((E-Ef)/(kB*T))+1)
+    # fc = 1/(exp(x)+1) = expit(-x) and fv = 1-fc = expit(x), with x = (E-Ef)/kT computed once.
+    # out=(fc, fv) writes into preallocated arrays (as numpy's out=) instead of allocating new ones,
+    # which must have the broadcast shape of all the inputs.
+def Func_fcfv(E,Ef,T, out=None): # dimensionless
+    fc, fv = out if out is not None else (np.empty(np.broadcast(E,Ef,T).shape), np.empty(np.broadcast(E,Ef,T).shape))
+    np.subtract(E, Ef, out=fv)
+    np.multiply(fv, 1/(kB*T), out=fv) # x
+    np.negative(fv, out=fc)
+    expit(fc, out=fc)
+    expit(fv, out=fv)
     return fc, fv
 
 # Maxwell Boltzmann probability distribution
     # Neamen Semiconductor Physics & Devices, Ed 2 (pg 75)
-def Func_MaxwellBoltzmann(E,Ef,T): #dimensionless
-    fb = np.reciprocal(np.exp((E-Ef)/(kB*T)))
+    # out= as in Func_fcfv
+def Func_MaxwellBoltzmann(E,Ef,T, out=None): #dimensionless
+    fb = out if out is not None else np.empty(np.broadcast(E,Ef,T).shape)
+    np.subtract(Ef, E, out=fb)
+    np.multiply(fb, 1/(kB*T), out=fb)
+    np.exp(fb, out=fb)
     return fb
 
 # Density of states in the conduction and valence bands
     # Pierret Semiconductor Fundamentals, Vol 1, Ed 2 (pg 36)
     # Neamen Semiconductor Physics & Devices, Ed 2 (pg 69-70)
-def Func_gcgv(E,Ec,Ev,mn,mp): # /(J*m**3)
-    Earg=E-Ec
-    Earg[Earg<0]=0
-    gc = 1/(2*sp.pi**2)*((2*mn)/(hbar**2))**(3/2)*np.sqrt(Earg)
-    Earg=Ev-E
-    Earg[Earg<0]=0
-    gv = 1/(2*sp.pi**2)*((2*mp)/(hbar**2))**(3/2)*np.sqrt(Earg)
+    # out=(gc, gv) as in Func_fcfv
+def Func_gcgv(E,Ec,Ev,mn,mp, out=None): # /(J*m**3)
+    gc, gv = out if out is not None else (np.empty(np.broadcast(E,Ec,Ev,mn,mp).shape), np.empty(np.broadcast(E,Ec,Ev,mn,mp).shape))
+    np.subtract(E, Ec, out=gc)
+    np.maximum(gc, 0, out=gc)
+    np.sqrt(gc, out=gc)
+    np.multiply(gc, 1/(2*sp.pi**2)*((2*mn)/(hbar**2))**(3/2), out=gc)
+    np.subtract(Ev, E, out=gv)
+    np.maximum(gv, 0, out=gv)
+    np.sqrt(gv, out=gv)
+    np.multiply(gv, 1/(2*sp.pi**2)*((2*mp)/(hbar**2))**(3/2), out=gv)
     return gc, gv
 
 
@@ -56,11 +154,13 @@ def Func_gcgv(E,Ec,Ev,mn,mp): # /(J*m**3)
     # Pierret Semiconductor Fundamentals, Vol 1, Ed 2 (pg 43)
     # Neamen Semiconductor Physics & Devices, Ed 2 (pg 86)
     # Jonscher Solid Semiconductors (pg 29)
-def Func_NeNh(E, fc, fv, gc, gv, Ec, Ev): # /(J*m**3)
-    Ne=fc*gc
-    Ne[E<Ec]=0
-    Nh=fv*gv
-    Nh[E>Ev]=0
+    # out=(Ne, Nh) as in Func_fcfv
+def Func_NeNh(E, fc, fv, gc, gv, Ec, Ev, out=None): # /(J*m**3)
+    Ne, Nh = out if out is not None else (np.empty(np.broadcast(E,fc,fv,gc,gv,Ec,Ev).shape), np.empty(np.broadcast(E,fc,fv,gc,gv,Ec,Ev).shape))
+    Ne.fill(0)
+    np.multiply(fc, gc, out=Ne, where=E>=Ec)
+    Nh.fill(0)
+    np.multiply(fv, gv, out=Nh, where=E<=Ev)
     return Ne, Nh
 
 # effective density of conduction and valence band states
@@ -92,9 +192,11 @@ def Func_ni(NC, NV, Eg, T): # 1/m**3
     # Pierret Semiconductor Fundamentals, Vol 1, Ed 2 (pg 45)
     # Neamen Semiconductor Physics & Devices, Ed 2 (pg 89-91)
     # Jonscher Solid Semiconductors (pg 30-31)
+    # Fermi-Dirac statistics (Physics_FermiDirac), which reduce to NC*exp((Ef-Ec)/kT) etc.
+    # unless Ef is within a few kT of a band edge
 def Func_nopo(NC, NV, Ec, Ev, Ef, T): # 1/m**3
-    no = NC * np.exp((-Ec+Ef)/(kB*T))
-    po = NV * np.exp((Ev-Ef)/(kB*T))
+    no = NC * Physics_FermiDirac.Func_FD(1/2, (-Ec+Ef)/(kB*T))
+    po = NV * Physics_FermiDirac.Func_FD(1/2, (Ev-Ef)/(kB*T))
     return no, po
 
 # Intrinsic level
@@ -117,17 +219,65 @@ def Func_nbpb(Na, Nd, ni): # /m**3
         nb = ni**2/pb
     return nb,pb
 
+# Charge neutrality in reduced units
+    # v = (Ef-Ei)/kT about the level Ei = (Ec+Ev)/2+kT/2*ln(NV/NC), and densities normalized to ni,
+    # so that no/ni = exp(cn)*F_1/2(v-cn) and po/ni = exp(cp)*F_1/2(-v-cp) with cn = (Ec-Ei)/kT = ln(NC/ni)
+    # and cp = (Ei-Ev)/kT = ln(NV/ni) (no/ni = exp(v), po/ni = exp(-v) when nondegenerate).
+    # Neutrality no+Na = po+Nd is taken in logs: ln(no+Na)-ln(po+Nd) = 0, with every density carried
+    # as its log, so nothing overflows or underflows, however degenerate or cold the semiconductor.
+    # The residual increases monotonically with v. Returns it and its analytic derivative d/dv.
+def Func_Ef_residual(v, ln_Nd, ln_Na, cn, cp):
+    ln_no = cn+Physics_FermiDirac.Func_lnFD(1/2, v-cn)
+    ln_po = cp+Physics_FermiDirac.Func_lnFD(1/2, -v-cp)
+    ln_neg = np.logaddexp(ln_no, ln_Na)
+    ln_pos = np.logaddexp(ln_po, ln_Nd)
+    # d ln(F_1/2)/d eta = F_-1/2/F_1/2
+    dln_no = np.exp(Physics_FermiDirac.Func_lnFD(-1/2, v-cn)+cn-ln_no)
+    dln_po = np.exp(Physics_FermiDirac.Func_lnFD(-1/2, -v-cp)+cp-ln_po)
+    expression = ln_neg-ln_pos
+    derivative = np.exp(ln_no-ln_neg)*dln_no+np.exp(ln_po-ln_pos)*dln_po
+    return expression, derivative
+
 # Fermi level
     # Pierret Semiconductor Fundamentals, Vol 1, Ed 2 (pg 49)
     # Neamen Semiconductor Physics & Devices, Ed 2 (pg 115)
     # Jonscher Solid Semiconductors (pg 33)
-def Func_Ef(NC, NV, Ec, Ev, T, Nd, Na): # J
-    guess = -1*e
-    def Ef_eqn(Ef_soln):
-        no, po = Func_nopo(NC, NV, Ec, Ev, Ef_soln, T)
-        expression = po-no+Nd-Na
-        return expression
-    Ef = fsolve(Ef_eqn, guess)[0]
+    # Solved in reduced units (see Func_Ef_residual) by Func_newton, which uses the analytic
+    # derivative. See Func_Ef_batch for the starting point.
+    # With full_output=True, also returns Func_newton's diagnostics.
+def Func_Ef(NC, NV, Ec, Ev, T, Nd, Na, full_output=False): # J
+    Ef, infodict = Func_Ef_batch(NC, NV, Ec, Ev, T, Nd, Na, full_output=True)
+    Ef = float(Ef) # J
+    if full_output:
+        return Ef, infodict
+    return Ef
+
+# Fermi level for whole arrays of T, Nd and/or Na at once
+    # Same reduced equation as Func_Ef. All inputs broadcast against each other (e.g. T of shape
+    # (n,1) against Nd of shape (m,)), and every point of the grid is solved simultaneously.
+    # Starts from the larger of the nondegenerate closed form asinh((Nd-Na)/(2*ni)) and the
+    # degenerate estimate from the inverse of F_1/2 (which is within ~1% of the root).
+    # With full_output=True, also returns Func_newton's diagnostics.
+def Func_Ef_batch(NC, NV, Ec, Ev, T, Nd, Na, full_output=False): # J
+    NC, NV, Ec, Ev, T, Nd, Na = np.broadcast_arrays(*[np.asarray(x,dtype=float) for x in (NC, NV, Ec, Ev, T, Nd, Na)])
+    Ei = (Ec+Ev)/2+(1/2)*kB*T*np.log(NV/NC) # J
+    ln_ni = np.log(np.sqrt(NC*NV))-(Ec-Ev)/(2*kB*T)
+    cn, cp = np.log(NC)-ln_ni, np.log(NV)-ln_ni
+    dN = Nd-Na # 1/m**3
+    with np.errstate(divide='ignore', over='ignore'):
+        ln_Nd, ln_Na = np.log(Nd)-ln_ni, np.log(Na)-ln_ni
+        lnA = np.log(np.abs(dN)/2)-ln_ni
+        guess = np.where(lnA > 20, lnA+np.log(2), np.arcsinh(np.exp(np.minimum(lnA,20)))) # asinh(|Nd-Na|/(2*ni))
+        degenerate = np.where(dN > 0, cn+Physics_FermiDirac.Func_FD_inverse(np.abs(dN)/NC), cp+Physics_FermiDirac.Func_FD_inverse(np.abs(dN)/NV))
+    guess = np.sign(dN)*np.maximum(guess, degenerate)
+    def Ef_eqn(v):
+        return Func_Ef_residual(v, ln_Nd, ln_Na, cn, cp)
+    width = 40+0.05*np.abs(guess)
+    v, infodict = Func_newton(Ef_eqn, guess, guess-width, guess+width)
+    Func_trace_record('Func_Ef', infodict)
+    Ef = Ei+v*kB*T # J
+    if full_output:
+        return Ef, infodict
     return Ef
 
 ################################################################################
@@ -170,13 +320,51 @@ def Func_LD(epsilon_sem,pb,T):
     LD = np.sqrt(kB*T*epsilon_o*epsilon_sem/(pb*e**2)) # m
     return LD
 
+# Reduced bulk Fermi level of each band, ((Ef-Ec)/kT, (Ev-Ef)/kT), the eta that switches Func_f and
+# everything built on it to Fermi-Dirac statistics
+def Func_eta(Ec,Ev,Ef,T): # dimensionless
+    return ((Ef-Ec)/(kB*T), (Ev-Ef)/(kB*T))
+
 # integration constants
     # Hudlet (1995) Electrostatic forces between metallic tip and semiconductor surfaces
-def Func_f(T,V,nb,pb):
+    # eta = ((Ef-Ec)/kT, (Ev-Ef)/kT) in the bulk switches to Fermi-Dirac statistics (see Func_f_FD)
+def Func_f(T,V,nb,pb, eta=None):
     u = V/(kB*T) #dimensionless
+    if eta is not None:
+        return Func_f_FD(u,nb/pb,1,eta)
     f = np.sqrt(np.exp(-u)+u-1+nb/pb*(np.exp(u)-u-1)) #dimensionless
     return f
 
+# integration constants with Fermi-Dirac statistics
+    # Same as Func_f, with each band's expm1(u)-u replaced by its Fermi-Dirac counterpart
+    # (Physics_FermiDirac.Func_FD_bandbending), for reduced potential u and densities nn, pn
+    # normalized to the same reference. Also returns d(f**2)/du.
+def Func_f_FD(u,nn,pn,eta, full_output=False):
+    Dn, dDn = Physics_FermiDirac.Func_FD_bandbending(eta[0], u, nn)
+    Dp, dDp = Physics_FermiDirac.Func_FD_bandbending(eta[1], -u, pn)
+    f = np.sqrt(np.maximum(Dn+Dp, 0)) #dimensionless
+    if full_output:
+        return f, dDn-dDp
+    return f
+
+# f**2 in reduced units, for densities nn, pn normalized to any common reference
+    # Returns f**2, d(f**2)/du and the flatband curvature c**2 = lim f**2/u**2 (so f ~ c*|u| near u = 0).
+    # expm1 keeps f**2 accurate right down to u~0, where exp(-u)+u-1 cancels.
+    # With eta (see Func_f) the carriers follow Fermi-Dirac statistics.
+def Func_fsq(u,nn,pn, eta=None): # dimensionless
+    with np.errstate(over='ignore', invalid='ignore'):
+        if eta is None:
+            fsq = np.where(pn > 0, pn*(np.expm1(-u)+u), 0)+np.where(nn > 0, nn*(np.expm1(u)-u), 0)
+            dfsq = np.where(pn > 0, -pn*np.expm1(-u), 0)+np.where(nn > 0, nn*np.expm1(u), 0)
+            flatband = (nn+pn)/2
+        else:
+            f, dfsq = Func_f_FD(u,nn,pn,eta, full_output=True)
+            fsq = f**2
+            # at flatband d(f**2)/du**2/2 = sum of n*F_-1/2/F_1/2 over the bands
+            flatband = (nn*np.exp(Physics_FermiDirac.Func_lnFD(-1/2,eta[0])-Physics_FermiDirac.Func_lnFD(1/2,eta[0]))
+                        +pn*np.exp(Physics_FermiDirac.Func_lnFD(-1/2,eta[1])-Physics_FermiDirac.Func_lnFD(1/2,eta[1])))/2
+    return fsq, dfsq, flatband
+
 # integration constants
     # Hudlet (1995) Electrostatic forces between metallic tip and semiconductor surfaces
     # added a term for patterned dopants under surface
@@ -215,24 +403,168 @@ def Func_Cins(zins):
     Cins= epsilon_o/zins #C/Vm**2
     return Cins
 
+# Surface potential equation in reduced units
+    # Func_Vs's equation divided by kT: with u = Vs/kT and ug = (Vg-CPD)/kT,
+    # u + lam*sign(u)*f(u) = ug,  lam = epsilon_sem*zins*sqrt(2)/LD
+    # Carrier densities are normalized to the majority density N = max(nb,pb) (and LD taken at N).
+    # It is the same equation, but nb/pb can no longer overflow when ni underflows at low temperature.
+    # The left side increases monotonically, so the root always lies between u = 0 and u = ug.
+def Func_Vs_reducedparams(Vg,zins,CPD,epsilon_sem,T,nb,pb):
+    N = np.maximum(nb,pb) # 1/m**3
+    ug = (Vg-CPD)/(kB*T) #dimensionless
+    lam = epsilon_sem*zins*np.sqrt(2)/Func_LD(epsilon_sem,N,T) #dimensionless
+    return ug, lam, nb/N, pb/N
+
+# Residual of the surface potential equation
+    # arcsinh(u + lam*sign(u)*f(u)) - arcsinh(ug) and its analytic derivative d/du.
+    # Taking arcsinh of both sides keeps the root, but makes the residual close to linear
+    # where the surface charge grows exponentially with u.
+    # With eta (see Func_f) the carriers follow Fermi-Dirac statistics.
+def Func_Vs_residual(u,ug,lam,nn,pn, eta=None):
+    with np.errstate(over='ignore', invalid='ignore'):
+        fsq, dfsq, flatband = Func_fsq(u,nn,pn, eta)
+        f = np.sqrt(np.maximum(fsq, 0))
+        # d(sign(u)*f)/du, which tends to sqrt((nn+pn)/2) at flatband
+        dg = np.where(f > 0, np.abs(dfsq)/(2*f), np.sqrt(flatband))
+        h = u+lam*np.sign(u)*f
+        expression = np.arcsinh(h)-np.arcsinh(ug)
+        derivative = (1+lam*dg)/np.hypot(1,h)
+    return expression, derivative
+
 # Surface potential
-def Func_Vs(Vg,zins,CPD,Na,Nd,epsilon_sem,T,nb,pb,ni, x, D_dens):
-    if Na <=1e-9: #n-type
-        guess = 1*e
-    elif Nd <= 1e-9: #p-type
-        guess = -1*e
-    def Vs_eqn(Vs,Vg_variable,zins_variable):
-        fs = Func_f(T,Vs,nb,pb)
-        #fs = Func_f_D(T,Vs,nb,pb, x, D_dens)
-        Es = Func_E(nb,pb,Vs,epsilon_sem,T,fs)
-        Qs = Func_Q(epsilon_sem,Es)
-        Cins = Func_Cins(zins_variable)
-        expression = Vg_variable-CPD-Vs+e*Qs/Cins #J
-        ic(expression, fs, Es, Qs, Cins)
-        return expression
-    Vs = fsolve(Vs_eqn, guess, args=(Vg,zins), full_output=True)[0] #J
+    # Solved in reduced units (see Func_Vs_residual) by Func_newton, which uses the analytic
+    # derivative, starting from the equation linearized about flatband.
+    # With eta = ((Ef-Ec)/kT, (Ev-Ef)/kT) in the bulk, uses Fermi-Dirac statistics.
+    # With full_output=True, also returns Func_newton's diagnostics.
+def Func_Vs(Vg,zins,CPD,Na,Nd,epsilon_sem,T,nb,pb,ni, x=None, D_dens=None, full_output=False, eta=None):
+    ug, lam, nn, pn = Func_Vs_reducedparams(Vg,zins,CPD,epsilon_sem,T,nb,pb)
+    guess = np.atleast_1d(ug/(1+lam*np.sqrt((nn+pn)/2)))
+    def Vs_eqn(u):
+        return Func_Vs_residual(u,ug,lam,nn,pn, eta)
+    u, infodict = Func_newton(Vs_eqn, guess, 0, ug)
+    Func_trace_record('Func_Vs', infodict)
+    Vs = u*kB*T #J
+    if full_output:
+        return Vs, infodict
     return Vs
 
+# Surface potential for whole arrays of Vg and/or zins at once
+    # Same reduced equation as Func_Vs, but every point is solved simultaneously
+    # by safeguarded Newton (Func_newton) with the analytic derivative, on the
+    # bracket between u = 0 and u = ug. Typically converges in under ten iterations.
+    # A guess for Vs (J, e.g. the solution at a neighbouring point of a sweep) cuts that to two or three.
+    # eta is as in Func_Vs. With full_output=True, also returns Func_newton's diagnostics.
+def Func_Vs_batch(Vg,zins,CPD,Na,Nd,epsilon_sem,T,nb,pb,ni, xtol=1e-12, maxiter=100, full_output=False, guess=None, eta=None):
+    Vg, zins = np.broadcast_arrays(np.asarray(Vg,dtype=float), np.asarray(zins,dtype=float))
+    ug, lam, nn, pn = Func_Vs_reducedparams(Vg,zins,CPD,epsilon_sem,T,nb,pb)
+    def Vs_eqn(u):
+        return Func_Vs_residual(u,ug,lam,nn,pn, eta)
+    if guess is None:
+        guess = ug/(1+lam*np.sqrt((nn+pn)/2))
+    else:
+        guess = np.asarray(guess)/(kB*T)
+    u, infodict = Func_newton(Vs_eqn, guess, 0, ug, xtol, maxiter)
+    Func_trace_record('Func_Vs_batch', infodict)
+    Vs = u*kB*T #J
+    if full_output:
+        return Vs, infodict
+    return Vs
+
+# Gate bias that gives a surface potential Vs (the Func_Vs equation solved for Vg)
+def Func_Vg_Vs(Vs,zins,CPD,epsilon_sem,T,nb,pb, eta=None): # J
+    fs = Func_f(T,Vs,nb,pb, eta)
+    Es = Func_E(nb,pb,Vs,epsilon_sem,T,fs)
+    Qs = Func_Q(epsilon_sem,Es)
+    Cins = Func_Cins(zins)
+    Vg = CPD+Vs-e*Qs/Cins #J
+    return Vg
+
+# Insulator thickness that gives a surface potential Vs (the Func_Vs equation solved for zins)
+def Func_zins_Vs(Vs,Vg,CPD,epsilon_sem,T,nb,pb, eta=None): # m
+    fs = Func_f(T,Vs,nb,pb, eta)
+    Es = Func_E(nb,pb,Vs,epsilon_sem,T,fs)
+    Qs = Func_Q(epsilon_sem,Es)
+    zins = epsilon_o*(Vg-CPD-Vs)/(-e*Qs) #m
+    return zins
+
+# Surface potential by inverse mapping instead of root-finding
+    # If only Vg varies, sample Vs densely, evaluate Vg(Vs) in closed form and interpolate
+    # back with a monotone (PCHIP) interpolant; likewise zins(Vs) if only zins varies.
+    # Vg-CPD and zins grow roughly exponentially with |Vs|, so we interpolate against
+    # arcsinh((Vg-CPD)/kT) and log(zins), where the relation is close to linear.
+    # A coarse table first narrows the grid to the Vs range the targets actually need.
+    # Arrays where both Vg and zins vary, or targets outside the table, go to Func_Vs_batch.
+    # guess is accepted so that it has the same call signature as Func_Vs_batch, and is not used.
+    # eta is as in Func_Vs.
+def Func_Vs_inverse(Vg,zins,CPD,Na,Nd,epsilon_sem,T,nb,pb,ni, numsamples=2048, guess=None, eta=None):
+    Vg, zins = np.broadcast_arrays(np.asarray(Vg,dtype=float), np.asarray(zins,dtype=float))
+    Vs = np.zeros(Vg.shape) #J
+    kT = kB*T #J
+
+    if np.ptp(zins) == 0 and np.ptp(Vg) != 0: # bias sweep, grid variable is u = Vs/kT
+        def tabulate(grid):
+            u = grid
+            x = np.arcsinh((Func_Vg_Vs(u*kT,zins.flat[0],CPD,epsilon_sem,T,nb,pb, eta)-CPD)/kT)
+            return u, x
+        x_target = np.arcsinh((Vg-CPD)/kT)
+        g_lo = min(0, np.min(Vg)-CPD)/kT
+        g_hi = max(0, np.max(Vg)-CPD)/kT
+        coarse = np.sinh(np.linspace(np.arcsinh(g_lo), np.arcsinh(g_hi), numsamples//8))
+    elif np.ptp(Vg) == 0 and Vg.size > 0: # zins sweep, grid variable is logit(Vs/(Vg-CPD))
+        ug = (Vg.flat[0]-CPD)/kT
+        if ug == 0:
+            return Vs
+        def tabulate(grid):
+            u = ug/(1+np.exp(-grid))
+            x = np.log(Func_zins_Vs(u*kT,Vg.flat[0],CPD,epsilon_sem,T,nb,pb, eta))
+            return u, x
+        x_target = np.log(zins)
+        coarse = np.linspace(-40, 36, numsamples//8)
+    else:
+        return Func_Vs_batch(Vg,zins,CPD,Na,Nd,epsilon_sem,T,nb,pb,ni, eta=eta)
+
+    # Table sorted in x, keeping finite samples away from u~0 (where f loses precision; the
+    # exact point Vs = 0 is put back when the grid spans it) and only the part in which
+    # u is strictly monotone in x
+    def sorted_table(grid):
+        with np.errstate(over='ignore', invalid='ignore', divide='ignore'):
+            u, x = tabulate(grid)
+        keep = np.isfinite(x) & (np.abs(u) > 1e-3)
+        if np.min(u) < 0 < np.max(u):
+            grid, u, x = np.hstack((grid[keep], 0)), np.hstack((u[keep], 0)), np.hstack((x[keep], 0))
+        else:
+            grid, u, x = grid[keep], u[keep], x[keep]
+        x, index = np.unique(x, return_index=True)
+        grid, u = grid[index], u[index]
+        if len(x) > 1:
+            monotone = np.hstack((True, np.diff(u)*np.sign(u[-1]-u[0]) > 0))
+            grid, u, x = grid[monotone], u[monotone], x[monotone]
+        return grid, u, x
+
+    # Coarse pass over the whole range, then a dense pass restricted to the part of the
+    # table bracketing the targets, spaced evenly along the arc length of the u(x) curve
+    # so that steep and strongly curved stretches get their share of samples
+    grid, u_samples, x_samples = sorted_table(coarse)
+    if len(x_samples) > 1:
+        i_lo = np.clip(np.searchsorted(x_samples, np.min(x_target))-1, 0, len(x_samples)-2)
+        i_hi = np.clip(np.searchsorted(x_samples, np.max(x_target))+1, i_lo+2, len(x_samples))
+        grid, u_samples, x_samples = grid[i_lo:i_hi], u_samples[i_lo:i_hi], x_samples[i_lo:i_hi]
+        arclength = np.hstack((0, np.cumsum(np.hypot(np.diff(x_samples), np.diff(u_samples)))))
+        dense = np.interp(np.linspace(0, arclength[-1], numsamples), arclength, grid)
+        grid, u_samples, x_samples = sorted_table(dense)
+    if len(x_samples) < 2:
+        return Func_Vs_batch(Vg,zins,CPD,Na,Nd,epsilon_sem,T,nb,pb,ni, eta=eta)
+
+    inside = (x_target >= x_samples[0]) & (x_target <= x_samples[-1])
+    Vs[inside] = PchipInterpolator(x_samples, u_samples)(x_target[inside])*kT
+    if not np.all(inside):
+        Vs[~inside] = Func_Vs_batch(Vg[~inside],zins[~inside],CPD,Na,Nd,epsilon_sem,T,nb,pb,ni, eta=eta)
+    return Vs
+
+# Surface potential solvers that builders can choose between by name
+    # (Physics_Poisson adds 'poisson' on import, which Organization_BuildArrays does)
+Vs_solvers = {'batch': Func_Vs_batch, 'inverse': Func_Vs_inverse}
+
 # Force between MIS plates
     # Hudlet (1995) Electrostatic forces between metallic tip and semiconductor surfaces
 def Func_F(Qs,CPD,Vg,zins):
@@ -311,12 +643,12 @@ if __name__ == "__main__":
 
 
 
-    Vg = 5/e # gate bias in joules
+    Vg = 5*e # gate bias in joules
     zins = 5e-9 # m
-    CPD = 500e-3 # V
+    CPD = 500e-3*e # J
     Na = 9.15e20 # bulk dopant density in m^-3
     Nd = 0 #m^-3
-    epsilon_sem = 11.8*epsilon_o
+    epsilon_sem = 11.8 # relative permittivity, the functions multiply in epsilon_o
     T = 300 #K
     Eg = 0.7*1.6022e-19 # silicon bandgap in J
     mn = 1.1 * me # electron effective mass
@@ -328,16 +660,22 @@ if __name__ == "__main__":
     D_dens = 1e18 # patterned dopant density in m^-2 
 
     # try and solve for Vs
-    for i in range(5):
-        Vs = Func_Vs(Vg,zins,CPD,Na,Nd,epsilon_sem,T,nb,pb,ni, x, D_dens)
-        ic(Vs)
-    # answer comes out as same as the guess, fsolve says it's converging though
+    # (this used to come out as the guess: Vg, CPD and epsilon_sem were not in the units the functions expect)
+    Vs, infodict = Func_Vs(Vg,zins,CPD,Na,Nd,epsilon_sem,T,nb,pb,ni, x, D_dens, full_output=True)
+    print(Vs/e, infodict['nfev'], infodict['converged'])
+
+    # the closed form above cannot include the patterned dopants, so solve Poisson's equation with them
+    # (dist(x) spread over its width, so that it integrates to D_dens)
+    import Physics_Poisson
+    Nd_z = lambda z: Nd+D_dens*dist(z)/(np.sqrt(2*np.pi)*2e-9) # m^-3
+    Vs_D, Qs_D, band_D = Physics_Poisson.Func_Vs_Poisson(Vg,zins,CPD,epsilon_sem,T,nb,pb, Nd_z, Na)
+    print(Vs_D/e, Qs_D)
 
     # try plotting the Vs equation
 
     Vs_list = []
     f_vs_list = []
-    ic(e)
+    print(e)
     for i in range(100):
         Vs = 1*e*(i-50)
         f_Vs = Vs_eqn_(Vs,Vg,zins)
@@ -6,29 +6,47 @@
 ################################################################################
 
 import numpy as np
-from scipy.integrate import trapz
+from functools import lru_cache
 
 import Physics_Semiconductors
 
 ################################################################################
 ################################################################################
 
-# Frequency shift and dissipation definitions
-def dfdg(time_AFMarray,F_AFMarray,Fcant_AFMarray,frequency,springconst,amplitude,Qfactor,tipradius,cantarea,geometrybuttons):
-    df_prefactor = -1*(frequency**2)/(2*np.pi*springconst*amplitude) #Hz**2/N
-    dg_prefactor = -1*(frequency)/(np.pi) #Hz
-    dg_addedterm = (springconst*amplitude)/(Qfactor) #N
-    tiparea = np.pi*tipradius**2 #m**2
+# Projection of a force onto the fundamental of the oscillation
+    # With trapezoid weights w on the time grid, trapz(F*cos(frequency*t), t) = F @ (w*cos(frequency*t)),
+    # and likewise for sin, so the quadrature-weighted basis (numtimes, 2) is computed once per time grid
+    # and frequency, and a whole (bias x time) force matrix is projected with one matrix product.
+    # Cached on the grid's bytes, since arrays are not hashable.
+@lru_cache(maxsize=16)
+def dfdg_basis(time_bytes, frequency):
+    time_AFMarray = np.frombuffer(time_bytes)
+    weights = np.zeros(len(time_AFMarray))
+    weights[1:] += np.diff(time_AFMarray)/2
+    weights[:-1] += np.diff(time_AFMarray)/2
+    basis = np.stack((weights*np.cos(frequency*time_AFMarray), weights*np.sin(frequency*time_AFMarray)), axis=1)
+    basis.flags.writeable = False
+    return basis
 
-    F_tot = 0
+# Total force on the tip and/or cantilever, from the force per unit area under each
+def dfdg_Ftot(shape,F_AFMarray,Fcant_AFMarray,tipradius,cantarea,geometrybuttons):
+    tiparea = np.pi*tipradius**2 #m**2
+    F_tot = np.zeros(np.broadcast_shapes(shape, np.shape(F_AFMarray), np.shape(Fcant_AFMarray))) #N
     if 1 in geometrybuttons:
         F_tot+=F_AFMarray*tiparea
     if 2 in geometrybuttons:
         F_tot+=Fcant_AFMarray*cantarea
+    return F_tot
 
-    # Integrals
-    df = df_prefactor*trapz(F_tot*np.cos(frequency*time_AFMarray), time_AFMarray) #Hz
-    dg = dg_prefactor*trapz(F_tot*np.sin(frequency*time_AFMarray), time_AFMarray)+dg_addedterm #N
+# Frequency shift and dissipation from the integrals of F_tot*cos(frequency*t) and F_tot*sin(frequency*t)
+# over one period
+def dfdg_integrals(cos_integral,sin_integral,frequency,springconst,amplitude,Qfactor):
+    df_prefactor = -1*(frequency**2)/(2*np.pi*springconst*amplitude) #Hz**2/N
+    dg_prefactor = -1*(frequency)/(np.pi) #Hz
+    dg_addedterm = (springconst*amplitude)/(Qfactor) #N
+
+    df = df_prefactor*cos_integral #Hz
+    dg = dg_prefactor*sin_integral+dg_addedterm #N
 
     # Convert excitation model to energy units
         # Cockins thesis eq. 2.15
@@ -39,3 +57,39 @@ def dfdg(time_AFMarray,F_AFMarray,Fcant_AFMarray,frequency,springconst,amplitude
     dg = E_ts #meV
 
     return df, dg
+
+# Frequency shift and dissipation definitions
+    # F_AFMarray and Fcant_AFMarray may hold one oscillation per row (time along the last axis), and
+    # then df and dg have one entry per row.
+def dfdg(time_AFMarray,F_AFMarray,Fcant_AFMarray,frequency,springconst,amplitude,Qfactor,tipradius,cantarea,geometrybuttons):
+    F_tot = dfdg_Ftot(np.shape(time_AFMarray),F_AFMarray,Fcant_AFMarray,tipradius,cantarea,geometrybuttons)
+
+    # Integrals
+    basis = dfdg_basis(np.ascontiguousarray(time_AFMarray, dtype=float).tobytes(), float(frequency))
+    cos_integral, sin_integral = np.moveaxis(F_tot @ basis, -1, 0)
+    return dfdg_integrals(cos_integral,sin_integral,frequency,springconst,amplitude,Qfactor)
+
+################################################################################
+################################################################################
+# Harmonics
+
+# Harmonic spectrum of the total force
+    # For oscillations on the uniform grid of AFM1_inputvalues (timesteps+1 points over one period, the last
+    # repeating the first), one per row. One rFFT over the time axis gives, for every row at once, the complex
+    # amplitudes c_n of harmonics n = 0..timesteps/2, with F_tot(t) = Re(sum_n c_n*exp(i*n*frequency*t)), so
+    # Re(c_n) and -Im(c_n) are the cos and sin amplitudes of harmonic n (N).
+    # On this grid the trapezoid rule of dfdg is the same sum, so the spectrum gives df and dg exactly
+    # (dfdg_harmonics) along with every higher harmonic, at no extra solve.
+def harmonics(F_AFMarray,Fcant_AFMarray,tipradius,cantarea,geometrybuttons):
+    F_tot = dfdg_Ftot(np.shape(F_AFMarray),F_AFMarray,Fcant_AFMarray,tipradius,cantarea,geometrybuttons)[...,:-1]
+    timesteps = F_tot.shape[-1]
+    spectrum = np.fft.rfft(F_tot, axis=-1)*(2/timesteps) #N
+    spectrum[...,0] /= 2
+    if timesteps%2 == 0: # Nyquist harmonic
+        spectrum[...,-1] /= 2
+    return spectrum
+
+# Frequency shift and dissipation from a harmonic spectrum: the integrals of dfdg are pi/frequency times
+# the cos and sin amplitudes of the fundamental
+def dfdg_harmonics(spectrum,frequency,springconst,amplitude,Qfactor):
+    return dfdg_integrals(np.pi/frequency*spectrum[...,1].real,-np.pi/frequency*spectrum[...,1].imag,frequency,springconst,amplitude,Qfactor)
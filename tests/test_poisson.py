@@ -0,0 +1,68 @@
+################################################################################
+################################################################################
+# For uniform doping, the finite-difference Poisson solver must reproduce the
+# closed-form surface potential and band bending, with Boltzmann and with
+# Fermi-Dirac statistics, and drop into the builders as one of their solvers.
+################################################################################
+################################################################################
+
+import os
+import sys
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import Physics_Semiconductors
+import Physics_BandDiagram
+import Physics_Poisson
+import Organization_IntermValues
+import Organization_BuildArrays
+import Organization_Sweep
+
+# Bulk state of the silicon preset, with the donor slider at slider_donor
+def bulk(slider_donor):
+    params = Organization_Sweep.Sweep_presets(2, 2)
+    Vg,zins,Eg,epsilon_sem,WFmet,EAsem,Nd,Na,mn,mp,T,sampletype,biassteps,zinssteps,Vg_array,zins_array = Organization_IntermValues.Surface_inputvalues(0,params['zins'],params['alpha'],params['Eg'],params['epsilonsem'],params['WFmet'],params['EAsem'],slider_donor,params['acceptor'],params['emass'],params['hmass'],params['T'],16,16)
+    NC,NV,Ec,Ev,Ei,Ef,no,po,ni,nb,pb,CPD,LD,eta = Organization_IntermValues.Surface_bulkcalculations(Eg,epsilon_sem,WFmet,EAsem,Nd,Na,mn,mp,T)
+    return zins,Na,Nd,epsilon_sem,T,CPD,LD,nb,pb,ni,eta
+
+@pytest.mark.parametrize('slider_donor', [30, 36, 37])
+@pytest.mark.parametrize('statistics', ['Boltzmann', 'Fermi-Dirac'])
+def test_uniform_doping(slider_donor, statistics):
+    zins,Na,Nd,epsilon_sem,T,CPD,LD,nb,pb,ni,eta = bulk(slider_donor)
+    eta = eta if statistics == 'Fermi-Dirac' else None
+    Vg_array = np.linspace(-10,10,21)*Physics_Semiconductors.e #J
+
+    Vs, Qs, [zsem, Vsem, Esem, Qsem] = Physics_Poisson.Func_Vs_Poisson(Vg_array,zins,CPD,epsilon_sem,T,nb,pb, eta=eta)
+    Vs_batch = Physics_Semiconductors.Func_Vs_batch(Vg_array,zins,CPD,Na,Nd,epsilon_sem,T,nb,pb,ni, eta=eta)
+    assert np.max(np.abs(Vs-Vs_batch)) < 5e-5*Physics_Semiconductors.e
+
+    # one row per point, starting at the surface, as BandBending_batch lays them out
+    assert zsem.shape == Vsem.shape == Esem.shape == Qsem.shape == (len(Vg_array), zsem.shape[1])
+    assert np.all(zsem[:,0] == 0) and np.all(Vsem[:,0] == Vs)
+    assert np.all(np.abs(Vsem[:,-1]) < 1e-3*np.abs(Vs)+1e-12*Physics_Semiconductors.e)
+
+# Named in the builders, the solver gives the same curves and its own band profile
+def test_builder_solver():
+    zins,Na,Nd,epsilon_sem,T,CPD,LD,nb,pb,ni,eta = bulk(36)
+    Vg_array = np.linspace(-10,10,21)*Physics_Semiconductors.e #J
+    poisson = Organization_BuildArrays.Surface_biasarrays(Vg_array,zins,Na,Nd,epsilon_sem,T,CPD,LD,nb,pb,ni,eta, 'poisson', outputs=['Vs','Qs','zsem','Vsem'])
+    batch = Organization_BuildArrays.Surface_biasarrays(Vg_array,zins,Na,Nd,epsilon_sem,T,CPD,LD,nb,pb,ni,eta, 'batch', outputs=['Vs','Qs','zsem'])
+    assert np.max(np.abs(poisson['Vs']-batch['Vs'])) < 5e-5*Physics_Semiconductors.e
+    assert poisson['Qs'] == pytest.approx(batch['Qs'], rel=1e-3)
+    assert len(poisson['zsem']) == len(batch['zsem']) == len(Vg_array)
+    assert np.all(poisson['Vsem'][:,0] == poisson['Vs'])
+
+# A buried donor layer, solved for every timestep of an oscillation
+def test_buried_layer():
+    zins,Na,Nd,epsilon_sem,T,CPD,LD,nb,pb,ni,eta = bulk(32)
+    layer = lambda z: nb+1e18*np.exp(-(z-3.5e-9)**2/(2*(1e-9)**2))/(np.sqrt(2*np.pi)*1e-9) # m^-3
+    solver = Physics_Poisson.Poisson_solver(layer, pb)
+    zinslag_AFMarray = zins+np.linspace(0,10,9)*1e-9 #m
+    Vg = 2*Physics_Semiconductors.e #J
+    values = Organization_BuildArrays.AFM_timearrays(None,None,zinslag_AFMarray,Vg,zins,Na,Nd,epsilon_sem,T,CPD,LD,nb,pb,ni,eta, solver, outputs=['Vs','Vsem'])
+    uniform = Organization_BuildArrays.AFM_timearrays(None,None,zinslag_AFMarray,Vg,zins,Na,Nd,epsilon_sem,T,CPD,LD,nb,pb,ni,eta, outputs=['Vs'])
+    assert values['Vsem'].shape[0] == len(zinslag_AFMarray)
+    # the extra positive charge below the surface raises Vs (u'' = -(p-n+Nd-Na)) at every timestep
+    assert np.all(values['Vs'] > uniform['Vs'])
@@ -0,0 +1,42 @@
+################################################################################
+################################################################################
+# The curves of the sweep builders must pass through the point that
+# Organization_IntermValues.Surface_calculations puts on them, also for a
+# degenerately doped preset, where Fermi-Dirac statistics matter.
+################################################################################
+################################################################################
+
+import os
+import sys
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import Physics_Semiconductors
+import Organization_IntermValues
+import Organization_BuildArrays
+import Organization_Sweep
+
+# Silicon presets, with the donor slider at 1e26, 1e27 and 1e28 /m**3
+@pytest.mark.parametrize('slider_donor', [35, 36, 37])
+@pytest.mark.parametrize('slider_Vg', [-8, 8])
+@pytest.mark.parametrize('solver', ['batch', 'inverse'])
+def test_point_on_curves(slider_donor, slider_Vg, solver):
+    params = Organization_Sweep.Sweep_presets(2, 2)
+    Vg,zins,Eg,epsilon_sem,WFmet,EAsem,Nd,Na,mn,mp,T,sampletype,biassteps,zinssteps,Vg_array,zins_array = Organization_IntermValues.Surface_inputvalues(slider_Vg,params['zins'],params['alpha'],params['Eg'],params['epsilonsem'],params['WFmet'],params['EAsem'],slider_donor,params['acceptor'],params['emass'],params['hmass'],params['T'],16,16)
+    NC,NV,Ec,Ev,Ei,Ef,no,po,ni,nb,pb,CPD,LD,eta,Vs,Es,Qs,F,regime, zsem,Vsem,Esem,Qsem, P = Organization_IntermValues.Surface_calculations(Vg,zins,Eg,epsilon_sem,WFmet,EAsem,Nd,Na,mn,mp,T)
+    kT = Physics_Semiconductors.kB*T
+
+    bias = Organization_BuildArrays.Surface_biasarrays(np.array([Vg, 0.5*Vg]),zins,Na,Nd,epsilon_sem,T,CPD,LD,nb,pb,ni,eta, solver, outputs=['Vs','F'])
+    thickness = Organization_BuildArrays.Surface_zinsarrays(np.array([zins, 2*zins]),Vg,Na,Nd,epsilon_sem,T,CPD,LD,nb,pb,ni,eta, solver, outputs=['Vs','F'])
+    for curve in (bias, thickness):
+        assert abs(curve['Vs'][0]-Vs) < 1e-6*kT
+        assert curve['F'][0] == pytest.approx(F, rel=1e-6)
+
+    # The sweep engine, from slider values, at the bottom of the oscillation
+    params.update(Vg=slider_Vg, donor=slider_donor)
+    result = Organization_Sweep.Sweep(params, {'Vg': [slider_Vg]}, ['Vs'])
+    zinslag_AFMarray = Organization_IntermValues.AFM1_inputvalues(params['amplitude'],params['resfreq'],params['lag'],int(params['timesteps']),params['tipradius'],params['cantheight'],params['cantarea'], zins)[-1]
+    bottom = Organization_IntermValues.Surface_calculations(Vg,zinslag_AFMarray[int(params['timesteps']/2)],Eg,epsilon_sem,WFmet,EAsem,Nd,Na,mn,mp,T)[14]
+    assert abs(result['Vs'][0]-bottom) < 1e-6*kT